@@ -7,10 +7,72 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
+from kpi_calculations import read_fact_table
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional; sensor aggregation falls back to pandas groupby
+    njit = None
+
 # =============================================================================
 # PREDICTIVE MAINTENANCE
 # =============================================================================
 
+SENSOR_COLUMNS = ['Timestamp', 'EquipmentID', 'Temperature_C', 'Vibration_mm_s']
+
+def load_sensor_readings(data_dir: str, columns: list = None) -> pd.DataFrame:
+    """Load the sensor fact table, reading only the requested columns."""
+    return read_fact_table(data_dir, "Fact_Sensor_Readings", columns=columns,
+                           dtype={'EquipmentID': 'category', 'Temperature_C': 'float32',
+                                  'Vibration_mm_s': 'float32', '_RUL_Days': 'float32'},
+                           date_columns=['Timestamp'])
+
+if njit is not None:
+    @njit(cache=True)
+    def _sensor_stats_kernel(codes, temps, vibrations, n_groups):
+        """Single pass mean temperature / max vibration per integer-coded equipment."""
+        temp_sum = np.zeros(n_groups)
+        temp_count = np.zeros(n_groups)
+        max_vibration = np.full(n_groups, np.nan)
+        for i in range(codes.shape[0]):
+            g = codes[i]
+            if g < 0:
+                continue
+            if not np.isnan(temps[i]):
+                temp_sum[g] += temps[i]
+                temp_count[g] += 1
+            vibration = vibrations[i]
+            if not np.isnan(vibration) and (np.isnan(max_vibration[g]) or vibration > max_vibration[g]):
+                max_vibration[g] = vibration
+        return temp_sum / temp_count, max_vibration
+
+def _sensor_stats(equipment, temps, vibrations):
+    """Per-equipment average temperature and max vibration, in sorted equipment order like groupby."""
+    codes, equipment_ids = pd.factorize(equipment, sort=True)
+    temps = temps.astype(np.float64, copy=False)
+    vibrations = vibrations.astype(np.float64, copy=False)
+    
+    if njit is not None:
+        avg_temp, max_vibration = _sensor_stats_kernel(codes, temps, vibrations, len(equipment_ids))
+        return np.asarray(equipment_ids), avg_temp, max_vibration
+    
+    # Line rows up by equipment code, then reduce each contiguous run (NaNs skipped like pandas)
+    keep = codes >= 0
+    order = np.argsort(codes[keep], kind='stable')
+    group_sizes = np.bincount(codes[keep], minlength=len(equipment_ids))
+    starts = np.cumsum(group_sizes) - group_sizes
+    
+    temps_sorted = temps[keep][order]
+    temp_valid = ~np.isnan(temps_sorted)
+    temp_sum = np.add.reduceat(np.where(temp_valid, temps_sorted, 0.0), starts)
+    temp_count = np.add.reduceat(temp_valid.astype(np.float64), starts)
+    max_vibration = np.fmax.reduceat(vibrations[keep][order], starts)
+    with np.errstate(invalid='ignore'): # All-NaN groups average to NaN, as in pandas
+        avg_temp = temp_sum / temp_count
+    
+    return np.asarray(equipment_ids), avg_temp, max_vibration
+
 def predict_failure_probability(df_sensor: pd.DataFrame, window_hours: int = 24) -> pd.DataFrame:
     """
     Predict failure probability based on recent sensor readings.
@@ -23,46 +85,43 @@ def predict_failure_probability(df_sensor: pd.DataFrame, window_hours: int = 24)
     Returns:
         DataFrame with EquipmentID, Failure_Prob, Insight
     """
-    latest_ts = pd.to_datetime(df_sensor['Timestamp']).max()
-    cutoff_ts = latest_ts - timedelta(hours=window_hours)
-    
-    recent_readings = df_sensor[pd.to_datetime(df_sensor['Timestamp']) > cutoff_ts].copy()
-    
-    results = []
-    
-    for eq_id, group in recent_readings.groupby('EquipmentID'):
-        avg_temp = group['Temperature_C'].mean()
-        max_vibration = group['Vibration_mm_s'].max()
-        
-        prob = 0.0
-        insight = "Normal Operation"
-        
-        # Heuristics
-        if avg_temp > 95:
-            prob += 0.6
-            insight = "Critical Overheating Detected"
-        elif avg_temp > 85:
-            prob += 0.3
-            insight = "High Operating Temperature"
-            
-        if max_vibration > 5.0:
-            prob += 0.5
-            insight = f"{insight} + Excessive Vibration" if prob > 0 else "Excessive Vibration Detected"
-        elif max_vibration > 3.5:
-            prob += 0.2
-            
-        prob = min(prob, 0.99) # Cap at 99%
-        
-        results.append({
-            "EquipmentID": eq_id,
-            "Avg_Temp": round(avg_temp, 1),
-            "Max_Vibration": round(max_vibration, 2),
-            "Failure_Probability": round(prob * 100, 1),
-            "Insight": insight,
-            "Status": "Critical" if prob > 0.6 else ("Warning" if prob > 0.3 else "Healthy")
-        })
-        
-    return pd.DataFrame(results)
+    # No-op when the loader already parsed Timestamp; otherwise takes the fast ISO path
+    timestamps = pd.to_datetime(df_sensor['Timestamp'], format='ISO8601')
+    cutoff_ts = timestamps.max() - timedelta(hours=window_hours)
+    
+    # Slice only the columns we need instead of materializing the recent rows
+    recent = (timestamps > cutoff_ts).to_numpy()
+    equipment_ids, avg_temp, max_vibration = _sensor_stats(
+        df_sensor['EquipmentID'].to_numpy()[recent],
+        df_sensor['Temperature_C'].to_numpy()[recent],
+        df_sensor['Vibration_mm_s'].to_numpy()[recent]
+    )
+    
+    # Heuristics
+    temp_prob = np.where(avg_temp > 95, 0.6, np.where(avg_temp > 85, 0.3, 0.0))
+    vibration_prob = np.where(max_vibration > 5.0, 0.5, np.where(max_vibration > 3.5, 0.2, 0.0))
+    prob = np.minimum(temp_prob + vibration_prob, 0.99) # Cap at 99%
+    
+    insight = np.select(
+        [avg_temp > 95, avg_temp > 85],
+        ["Critical Overheating Detected", "High Operating Temperature"],
+        default="Normal Operation"
+    ).astype(object)
+    insight = np.where(max_vibration > 5.0, insight + " + Excessive Vibration", insight)
+    status = np.select(
+        [prob > 0.6, prob > 0.3],
+        ["Critical", "Warning"],
+        default="Healthy"
+    ).astype(object)
+    
+    return pd.DataFrame({
+        "EquipmentID": equipment_ids,
+        "Avg_Temp": np.round(avg_temp, 1),
+        "Max_Vibration": np.round(max_vibration, 2),
+        "Failure_Probability": np.round(prob * 100, 1),
+        "Insight": insight,
+        "Status": status
+    })
 
 # =============================================================================
 # FORECASTING
@@ -90,26 +149,25 @@ def forecast_maintenance_costs(df_budget: pd.DataFrame, months_ahead: int = 3) -
     avg_cost = last_6_months['ActualAmount'].mean()
     std_dev = last_6_months['ActualAmount'].std()
     
-    # Generate future dates
+    # Generate future dates: last_date + DateOffset(months=i), vectorised over the horizon.
+    # Step the month as a Period, then restore the day (clipped to the month's length) and time.
     last_date = monthly_costs['Date'].max()
-    future_data = []
-    
-    for i in range(1, months_ahead + 1):
-        next_date = last_date + pd.DateOffset(months=i)
-        
-        # Add some trend/seasonality simulation
-        trend_factor = 1 + (i * 0.02) # Assumes 2% monthly increase
-        forecast = avg_cost * trend_factor
-        
-        future_data.append({
-            "Date": next_date,
-            "ForecastAmount": round(forecast, 2),
-            "LowerBound": round(forecast - std_dev, 2),
-            "UpperBound": round(forecast + std_dev, 2),
-            "Type": "Forecast"
-        })
-        
-    return pd.DataFrame(future_data)
+    future_months = pd.period_range(start=last_date.to_period('M') + 1, periods=months_ahead, freq='M')
+    day_offset = np.minimum(last_date.day, future_months.days_in_month) - 1
+    future_dates = (future_months.to_timestamp() + pd.to_timedelta(day_offset, unit='D')
+                    + (last_date - last_date.normalize()))
+    
+    # Add some trend/seasonality simulation
+    trend_factor = 1 + np.arange(1, months_ahead + 1) * 0.02 # Assumes 2% monthly increase
+    forecast = avg_cost * trend_factor
+    
+    return pd.DataFrame({
+        "Date": future_dates,
+        "ForecastAmount": np.round(forecast, 2),
+        "LowerBound": np.round(forecast - std_dev, 2),
+        "UpperBound": np.round(forecast + std_dev, 2),
+        "Type": "Forecast"
+    })
 
 # =============================================================================
 # VENDOR RELIABILITY SCORING
@@ -126,38 +184,41 @@ def calculate_vendor_score(df_vendor: pd.DataFrame) -> pd.DataFrame:
     Returns:
         DataFrame including CompositeScore and Tier
     """
-    df = df_vendor.copy()
-    
-    # Normalize delay score (Max delay usually around 10 days, so 10-Delay gives points)
-    df['DelayScore'] = (10 - df['AvgDeliveryDelay']).clip(lower=0) * 2
-    
     # Weighted calculation
     # Rating (1-5) -> Max 50 points
     # Quality (0-100) -> Max 40 points
     # Delay -> Max 20 points
     # Total potential ~110, we normalize to 100
+    # Accumulated in place into one buffer so no intermediate columns are materialized
     
-    df['RawScore'] = (df['Rating'] * 10) + (df['QualityScore'] * 0.4) + df['DelayScore']
-    df['CompositeScore'] = df['RawScore'].clip(upper=100).round(1)
+    score = df_vendor['Rating'].to_numpy(dtype=float) * 10
+    score += df_vendor['QualityScore'].to_numpy() * 0.4
+    # Normalize delay score (Max delay usually around 10 days, so 10-Delay gives points)
+    score += np.maximum(10 - df_vendor['AvgDeliveryDelay'].to_numpy(), 0) * 2
+    np.minimum(score, 100, out=score)
+    composite_score = np.round(score, 1, out=score)
     
-    def get_tier(score):
-        if score >= 90: return "Strategic Partner"
-        elif score >= 80: return "Preferred"
-        elif score >= 70: return "Standard"
-        else: return "At Risk"
-        
-    df['VendorTier'] = df['CompositeScore'].apply(get_tier)
+    # Tier thresholds: >= 70 Standard, >= 80 Preferred, >= 90 Strategic Partner
+    tier_labels = np.array(["At Risk", "Standard", "Preferred", "Strategic Partner"])
+    tier_idx = np.searchsorted(np.array([70.0, 80.0, 90.0]), composite_score, side='right')
     
-    return df
+    return df_vendor.assign(CompositeScore=composite_score, VendorTier=tier_labels[tier_idx])
 
 def get_failure_root_cause(df_wo: pd.DataFrame) -> pd.Series:
     """
     Analyze the root cause of failures.
+    Accepts raw work orders or a build_work_order_rollup frame.
     """
 
-    breakdown_wo = df_wo[df_wo['MaintenanceType'] == 'Breakdown']
+    breakdowns = df_wo.loc[df_wo['MaintenanceType'] == 'Breakdown']
 
-    if breakdown_wo.empty:
+    if breakdowns.empty:
         return pd.Series(dtype=str)
 
-    return breakdown_wo['FailureCode'].value_counts()
+    if 'WorkOrderCount' in breakdowns:
+        counts = breakdowns.groupby('FailureCode', observed=True)['WorkOrderCount'].sum()
+        counts = counts.sort_values(ascending=False, kind='stable')
+    else:
+        counts = breakdowns['FailureCode'].value_counts()
+    # Categorical codes report every category; keep only the ones that occurred
+    return counts[counts > 0]
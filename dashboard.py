@@ -8,6 +8,7 @@ import time
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from styles import inject_custom_css, COLORS, format_currency
+from kpi_calculations import data_version, read_fact_table
 try:
     from analytics_engine import predict_rul_batch
 except ImportError:
@@ -29,26 +30,45 @@ inject_custom_css()
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 
+# data_mtime is only a cache key: regenerated files get a fresh load instead of the cached frames
 @st.cache_data
-def load_data():
-    files_to_load = {
-        'wo': "Fact_Maintenance_WorkOrders_Enriched.csv",
-        'sensor': "Fact_Sensor_Readings.csv",
-        'equip': "Dim_Equipment.csv",
-        'budget': "Fact_Budget_vs_Actual.csv",
+def load_data(data_mtime):
+    tables_to_load = {
+        'wo': "Fact_Maintenance_WorkOrders_Enriched",
+        'sensor': "Fact_Sensor_Readings",
+        'equip': "Dim_Equipment",
+        'budget': "Fact_Budget_vs_Actual",
+    }
+    columns = {
+        'sensor': ['Timestamp', 'EquipmentID', 'Temperature_C', 'Vibration_mm_s'],
+    }
+    date_columns = {
+        'wo': ['Date'],
+        'sensor': ['Timestamp'],
+        'budget': ['Date'],
+    }
+    column_dtypes = {
+        'wo': {'EquipmentID': 'category', 'TechnicianID': 'category', 'MaintenanceType': 'category'},
+        'sensor': {'EquipmentID': 'category', 'Temperature_C': 'float32', 'Vibration_mm_s': 'float32'},
+        'budget': {'CostCenter': 'category', 'GLAccount': 'category'},
     }
     
     loaded_data = {}
     missing_files = []
     
-    for key, filename in files_to_load.items():
-        file_path = os.path.join(DATA_DIR, filename)
-        if not os.path.exists(file_path):
+    for key, table in tables_to_load.items():
+        filename = f"{table}.csv"
+        if not os.path.exists(os.path.join(DATA_DIR, filename)):
             missing_files.append(filename)
             continue
             
         try:
-            loaded_data[key] = pd.read_csv(file_path)
+            loaded_data[key] = read_fact_table(
+                DATA_DIR, table,
+                columns=columns.get(key),
+                dtype=column_dtypes.get(key),
+                date_columns=date_columns.get(key)
+            )
         except Exception as e:
             st.error(f"Error loading {filename}: {str(e)}")
             return None
@@ -60,7 +80,7 @@ def load_data():
         
     return loaded_data
 
-data = load_data()
+data = load_data(data_version(DATA_DIR))
 
 # =============================================================================
 # SIDEBAR - PERSONA SELECTION
@@ -104,54 +124,59 @@ if data:
         
         # Simulate "Live" data by taking the last known reading for each equipment
         # In a real app, this would query an API or DB
-        latest_readings = df_sensor.sort_values('Timestamp').groupby('EquipmentID').tail(1).copy()
+        latest_idx = df_sensor.groupby('EquipmentID', observed=True, sort=False)['Timestamp'].idxmax()
+        latest_readings = df_sensor.loc[latest_idx].copy()
         
         # PREDICT RUL
         # We need to make sure we map these correctly
         rul_preds = predict_rul_batch(latest_readings) 
         latest_readings['Predicted_RUL'] = rul_preds
         
-        # Display Grid
-        cols = st.columns(3)
+        # Display Grid (all cards are sent to the frontend in a single message)
+        cards_html = []
+        name_map = df_equip.set_index('EquipmentID')['EquipmentName'].to_dict()
         
-        for idx, (i, row) in enumerate(latest_readings.iterrows()):
-            equip_name = df_equip[df_equip['EquipmentID'] == row['EquipmentID']]['EquipmentName'].values[0]
+        for _, row in latest_readings.iterrows():
+            equip_name = name_map.get(row['EquipmentID'], row['EquipmentID'])
+            
+            # Determine Status Color
+            rul = row['Predicted_RUL']
+            if rul < 7:
+                status_color = "red"
+                icon = "🚨"
+                msg = "CRITICAL FAILURE IMMINENT"
+            elif rul < 30:
+                status_color = "orange"
+                icon = "⚠️"
+                msg = "Maintenance Required Soon"
+            else:
+                status_color = "green"
+                icon = "✅"
+                msg = "Healthy Operation"
             
-            with cols[idx % 3]:
-                # Determine Status Color
-                rul = row['Predicted_RUL']
-                if rul < 7:
-                    status_color = "red"
-                    icon = "🚨"
-                    msg = "CRITICAL FAILURE IMMINENT"
-                elif rul < 30:
-                    status_color = "orange"
-                    icon = "⚠️"
-                    msg = "Maintenance Required Soon"
-                else:
-                    status_color = "green"
-                    icon = "✅"
-                    msg = "Healthy Operation"
-                
-                st.markdown(f"""
-                <div style="border: 1px solid #444; padding: 15px; border-radius: 10px; border-left: 10px solid {status_color}; background-color: #262730;">
-                    <h4 style="margin:0;">{icon} {equip_name}</h4>
-                    <p style="font-size: 0.9em; opacity: 0.8; margin-bottom: 10px;">ID: {row['EquipmentID']}</p>
-                    <div style="display: flex; justify-content: space-between; margin-bottom: 5px;">
-                        <span>🌡️ Temp: <b>{row['Temperature_C']}°C</b></span>
-                        <span>〰️ Vibration: <b>{row['Vibration_mm_s']}</b></span>
-                    </div>
-                    <hr style="margin: 5px 0;">
-                    <div style="text-align: center;">
-                        <span style="font-size: 0.8em;">ESTIMATED REMAINING LIFE</span><br>
-                        <strong style="font-size: 1.5em; color: {status_color};">{rul:.1f} Days</strong>
-                    </div>
-                     <div style="text-align: center; margin-top:5px; font-size: 0.8em; font-weight: bold; color: {status_color};">
-                        {msg}
-                    </div>
+            cards_html.append(f"""<div style="border: 1px solid #444; padding: 15px; border-radius: 10px; border-left: 10px solid {status_color}; background-color: #262730;">
+                <h4 style="margin:0;">{icon} {equip_name}</h4>
+                <p style="font-size: 0.9em; opacity: 0.8; margin-bottom: 10px;">ID: {row['EquipmentID']}</p>
+                <div style="display: flex; justify-content: space-between; margin-bottom: 5px;">
+                    <span>🌡️ Temp: <b>{row['Temperature_C']:.1f}°C</b></span>
+                    <span>〰️ Vibration: <b>{row['Vibration_mm_s']:.2f}</b></span>
                 </div>
-                """, unsafe_allow_html=True)
-                st.markdown("") # Spacer
+                <hr style="margin: 5px 0;">
+                <div style="text-align: center;">
+                    <span style="font-size: 0.8em;">ESTIMATED REMAINING LIFE</span><br>
+                    <strong style="font-size: 1.5em; color: {status_color};">{rul:.1f} Days</strong>
+                </div>
+                 <div style="text-align: center; margin-top:5px; font-size: 0.8em; font-weight: bold; color: {status_color};">
+                    {msg}
+                </div>
+            </div>""")
+        
+        st.markdown(
+            '<div style="display: grid; grid-template-columns: repeat(3, 1fr); gap: 1rem;">'
+            + "".join(cards_html)
+            + "</div>",
+            unsafe_allow_html=True
+        )
 
     # -------------------------------------------------------------------------
     # MANAGER VIEW
@@ -161,14 +186,15 @@ if data:
         
         # Quick Stats Row
         c1, c2, c3, c4 = st.columns(4)
-        total_open = len(df_wo[df_wo['DowntimeHours'].isna()]) # Proxy for open if Downtime not logged? Or just simulate
-        # Actually our enriched data is historical, so let's simulate "Open" as "Recent Breakdown"
-        recent_breakdowns = len(df_wo[df_wo['MaintenanceType'] == 'Breakdown'])
+        # Our enriched data is historical, so let's simulate "Open" as "Recent Breakdown"
+        type_counts = df_wo['MaintenanceType'].value_counts()
+        recent_breakdowns = int(type_counts.get('Breakdown', 0))
+        wo_means = df_wo[['TotalCost', 'DowntimeHours']].mean()
         
         c1.metric("Total Work Orders", len(df_wo))
         c2.metric("Breakdown Events", recent_breakdowns, delta_color="inverse")
-        c3.metric("Avg Repair Cost", format_currency(df_wo['TotalCost'].mean()))
-        c4.metric("Avg Downtime (Hrs)", f"{df_wo['DowntimeHours'].mean():.1f}")
+        c3.metric("Avg Repair Cost", format_currency(wo_means['TotalCost']))
+        c4.metric("Avg Downtime (Hrs)", f"{wo_means['DowntimeHours']:.1f}")
         
         st.markdown("### 📋 Active Work Order Queue (Simulated)")
         # Show 'recent' work orders
@@ -224,7 +250,7 @@ if data:
         st.progress(max(0, availability / 100), text=f"Overall Plant Availability: **{availability:.2f}%** ({days} days analysis)")
         
         st.markdown("### 💰 Cost Drivers")
-        cost_by_equip = df_wo.groupby('EquipmentID')['TotalCost'].sum().sort_values(ascending=False).head(5)
+        cost_by_equip = df_wo.groupby('EquipmentID', observed=True, sort=False)['TotalCost'].sum().sort_values(ascending=False).head(5)
         st.bar_chart(cost_by_equip)
 
 else:
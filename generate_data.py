@@ -1,8 +1,11 @@
 import pandas as pd
-import random
 import os
-from datetime import datetime, timedelta
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from sqlalchemy import create_engine
 
 # Configuration
@@ -14,6 +17,29 @@ START_DATE = datetime(2024, 1, 1)
 END_DATE = datetime(2025, 12, 31)
 NUM_DAYS = (END_DATE - START_DATE).days + 1
 
+SEED = 42
+
+# Seeded once, with an independent sub-stream per table: reruns are reproducible, and changing how
+# one table draws its numbers leaves every other table's output untouched
+(product_rng, inventory_rng, wo_rng, production_rng, budget_rng,
+ sensor_rng) = np.random.default_rng(SEED).spawn(6)
+
+# Everything this script writes. Output is a pure function of this file, so when all of it is newer
+# than the script there is nothing to regenerate (pass --force to rebuild anyway).
+FACT_TABLES = ["Fact_Inventory_Transactions", "Fact_Maintenance_WorkOrders", "Fact_Production_Data",
+               "Fact_Budget_vs_Actual", "Fact_Sensor_Readings"]
+GENERATED_FILES = ["Dim_Product.csv", "Dim_Equipment.csv", "Dim_Vendor.csv", "Dim_Technician.csv"] \
+    + [f"{name}.csv" for name in FACT_TABLES] + [f"{name}.parquet" for name in FACT_TABLES] + ["analytics.db"]
+
+def outputs_up_to_date():
+    script_mtime = os.path.getmtime(os.path.abspath(__file__))
+    paths = [os.path.join(OUTPUT_DIR, filename) for filename in GENERATED_FILES]
+    return all(os.path.exists(path) and os.path.getmtime(path) >= script_mtime for path in paths)
+
+if "--force" not in sys.argv and outputs_up_to_date():
+    print("Generated data is up to date; pass --force to regenerate.")
+    sys.exit(0)
+
 # Create output directory
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
@@ -22,9 +48,77 @@ if os.path.exists(DB_PATH):
     os.remove(DB_PATH)
     print(f"Removed old database file: {DB_PATH}")
 
-# Helper function for random dates
-def random_date(start, end):
-    return start + timedelta(days=random.randint(0, (end - start).days))
+# CSV header and values are left unquoted, as pandas' to_csv wrote them. pyarrow quotes the header
+# regardless of quoting_style, so it is written by hand; for values it raises if one contains a
+# comma, quote or newline, so a field that would need quoting fails loudly instead of corrupting a row.
+CSV_WRITE_OPTIONS = pacsv.WriteOptions(include_header=False, quoting_style="none")
+
+# Helper function for CSV output via pyarrow's native (multithreaded) writer.
+# Columns in date_columns are written as YYYY-MM-DD, other datetimes as YYYY-MM-DD HH:MM:SS.
+def _write_csv(df, filename, date_columns=()):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for i, field in enumerate(table.schema):
+        if pa.types.is_timestamp(field.type):
+            target = pa.date32() if field.name in date_columns else pa.timestamp("s")
+            table = table.set_column(i, field.name, table.column(i).cast(target))
+    with open(os.path.join(OUTPUT_DIR, filename), "wb") as f:
+        f.write((",".join(table.column_names) + "\n").encode())
+        pacsv.write_csv(table, f, CSV_WRITE_OPTIONS)
+
+# Helper function for ID columns: prefix + zero-padded numbers, built in one vectorized pass
+def make_ids(prefix, numbers, width=0):
+    return np.char.add(prefix, np.char.zfill(np.asarray(numbers).astype(str), width))
+
+# Low-cardinality string columns are stored as categoricals: int8 codes in memory, dictionary-encoded in Parquet
+CATEGORY_COLUMNS = ["Type", "MaintenanceType", "FailureCode", "CostCenter", "GLAccount", "Status",
+                    "EquipmentID", "ProductID", "TechnicianID"]
+
+def categorize(df):
+    return df.astype({c: "category" for c in CATEGORY_COLUMNS if c in df.columns})
+
+# Files are independent and pyarrow releases the GIL while writing, so writes are queued on
+# a small thread pool and overlap with generating the next table. Frames must not be mutated
+# after they are queued.
+csv_writer = ThreadPoolExecutor(max_workers=4)
+pending_writes = []
+
+def write_csv(df, filename, date_columns=()):
+    pending_writes.append(csv_writer.submit(_write_csv, df, filename, date_columns))
+
+# Fact tables also get a zstd Parquet copy (typed, columnar) for loaders that can skip the CSV parse.
+# An explicit schema sets the on-disk types instead of inferring them from the frame.
+def _write_parquet(df, filename, schema=None):
+    df.to_parquet(os.path.join(OUTPUT_DIR, filename), engine="pyarrow", compression="zstd",
+                  index=False, schema=schema)
+
+def write_parquet(df, filename, schema=None):
+    pending_writes.append(csv_writer.submit(_write_parquet, df, filename, schema))
+
+# Every table is also loaded into the SQLite database. SQLite takes one writer at a time, so these
+# go through their own single-thread queue; each table is one transaction. to_sql on the empty frame
+# creates the table with pandas' column types, then all rows go in through a single executemany on
+# the driver, skipping pandas' per-chunk row conversion. Columns in decimals are widened to float64
+# and rounded back to the generator's precision first, so float32 readings land as 79.4, not 79.40000152587891.
+db_writer = ThreadPoolExecutor(max_workers=1)
+
+def _sql_rows(df, decimals=None):
+    columns = []
+    for name, column in df.items():
+        if decimals and name in decimals:
+            column = column.astype(np.float64).round(decimals[name])
+        if pd.api.types.is_datetime64_any_dtype(column):
+            column = column.dt.strftime("%Y-%m-%d %H:%M:%S.%f") # SQLAlchemy's SQLite DATETIME format
+        columns.append(column.astype(object).where(column.notna(), None))
+    return list(zip(*columns))
+
+def _write_sql(df, table_name, decimals=None):
+    placeholders = ", ".join("?" * len(df.columns))
+    with DB_ENGINE.begin() as conn:
+        df.head(0).to_sql(table_name, conn, if_exists="replace", index=False)
+        conn.exec_driver_sql(f'INSERT INTO "{table_name}" VALUES ({placeholders})', _sql_rows(df, decimals))
+
+def write_sql(df, table_name, decimals=None):
+    pending_writes.append(db_writer.submit(_write_sql, df, table_name, decimals))
 
 # 1. Dim_Product
 products = [
@@ -38,12 +132,19 @@ products = [
     {"ProductID": "P008", "ProductName": "Coolant (L)", "Category": "Consumable", "ReorderPoint": 40, "SafetyStock": 15, "UnitCost": 150, "LeadTimeDays": 2, "MOQ": 20, "ABC_Class": "C", "UnitWeight": 1.0, "MaterialGroup": "Fluids"},
 ]
 
-# Add CurrentStock
-for p in products:
-    p["CurrentStock"] = random.randint(p["SafetyStock"], p["ReorderPoint"] + p["MOQ"])
+# Column (SoA) views of the products, indexed by integer position in the generators below
+product_ids = np.array([p["ProductID"] for p in products])
+product_costs = np.array([p["UnitCost"] for p in products], dtype=float)
+product_safety_stocks = np.array([p["SafetyStock"] for p in products])
+product_reorder_points = np.array([p["ReorderPoint"] for p in products])
+product_moqs = np.array([p["MOQ"] for p in products])
+n_products = len(products)
 
 df_product = pd.DataFrame(products)
-df_product.to_csv(f"{OUTPUT_DIR}/Dim_Product.csv", index=False)
+# Add CurrentStock
+df_product["CurrentStock"] = product_rng.integers(product_safety_stocks, product_reorder_points + product_moqs, endpoint=True)
+write_csv(df_product, "Dim_Product.csv")
+write_sql(df_product, "Dim_Product")
 print("Generated Dim_Product.csv")
 
 # 2. Dim_Equipment
@@ -56,7 +157,8 @@ equipment = [
     {"EquipmentID": "WL001", "EquipmentName": "Wheel Loader 980", "Type": "Heavy Machinery", "Manufacturer": "CAT", "Model": "980H", "InstallDate": "2021-08-15", "Criticality": "Medium", "FunctionalLocation": "Stockpile_Area"},
 ]
 df_equipment = pd.DataFrame(equipment)
-df_equipment.to_csv(f"{OUTPUT_DIR}/Dim_Equipment.csv", index=False)
+write_csv(df_equipment, "Dim_Equipment.csv")
+write_sql(df_equipment, "Dim_Equipment")
 print("Generated Dim_Equipment.csv")
 
 # 3. Dim_Vendor (Enriched)
@@ -68,7 +170,8 @@ vendors = [
     {"VendorID": "V005", "VendorName": "TechEquip Solutions", "Rating": 3.5, "PaymentTerms": "Net 60", "Category": "Equipment Dealer", "AvgDeliveryDelay": 8, "QualityScore": 80},
 ]
 df_vendor = pd.DataFrame(vendors)
-df_vendor.to_csv(f"{OUTPUT_DIR}/Dim_Vendor.csv", index=False)
+write_csv(df_vendor, "Dim_Vendor.csv")
+write_sql(df_vendor, "Dim_Vendor")
 print("Generated Dim_Vendor.csv")
 
 # 4. Dim_Technician (NEW)
@@ -80,215 +183,176 @@ technicians = [
     {"TechnicianID": "T005", "Name": "Michael Brown", "SkillLevel": "Senior", "HourlyRate": 90},
 ]
 df_technician = pd.DataFrame(technicians)
-df_technician.to_csv(f"{OUTPUT_DIR}/Dim_Technician.csv", index=False)
+write_csv(df_technician, "Dim_Technician.csv")
+write_sql(df_technician, "Dim_Technician")
 print("Generated Dim_Technician.csv")
 
 # 5. Fact_Inventory_Transactions
-transactions = []
-transaction_id = 1
-
-# Initial Stock
-for p in products:
-    transactions.append({
-        "TransactionID": f"TX{transaction_id:06d}",
-        "Date": START_DATE.strftime("%Y-%m-%d"),
-        "ProductID": p["ProductID"],
-        "Quantity": random.randint(p["ReorderPoint"] + 10, p["ReorderPoint"] + 50),
-        "Type": "Receipt",
-        "PurchaseOrderID": f"PO{random.randint(1000, 9999)}",
-        "BatchNumber": f"B{random.randint(100, 999)}",
-        "UnitCost": p["UnitCost"]
-    })
-    transaction_id += 1
-
-# Daily Transactions
-current_date = START_DATE
-while current_date <= END_DATE:
-    # Random Issues
-    num_issues = random.randint(0, 5)
-    for _ in range(num_issues):
-        p = random.choice(products)
-        qty = random.randint(1, 5)
-        transactions.append({
-            "TransactionID": f"TX{transaction_id:06d}",
-            "Date": current_date.strftime("%Y-%m-%d"),
-            "ProductID": p["ProductID"],
-            "Quantity": -qty, # Negative for issues
-            "Type": "Issue",
-            "PurchaseOrderID": "",
-            "BatchNumber": "",
-            "UnitCost": p["UnitCost"]
-        })
-        transaction_id += 1
-    
-    # Random Receipts (Replenishment)
-    if random.random() < 0.15: # 15% chance of receipt
-        p = random.choice(products)
-        qty = random.randint(p["MOQ"], p["MOQ"] * 3)
-        transactions.append({
-            "TransactionID": f"TX{transaction_id:06d}",
-            "Date": current_date.strftime("%Y-%m-%d"),
-            "ProductID": p["ProductID"],
-            "Quantity": qty,
-            "Type": "Receipt",
-            "PurchaseOrderID": f"PO{random.randint(10000, 99999)}",
-            "BatchNumber": f"B{random.randint(1000, 9999)}",
-            "UnitCost": p["UnitCost"] * random.uniform(0.95, 1.05) # Slight cost variation
-        })
-        transaction_id += 1
-        
-    current_date += timedelta(days=1)
-
-df_inv = pd.DataFrame(transactions)
-df_inv.to_csv(f"{OUTPUT_DIR}/Fact_Inventory_Transactions.csv", index=False)
+# Initial Stock (one receipt per product on the first day)
+init_prod = np.arange(n_products)
+init_qty = inventory_rng.integers(product_reorder_points + 10, product_reorder_points + 50, endpoint=True)
+
+# Random Issues (0-5 per day)
+issues_per_day = inventory_rng.integers(0, 5, size=NUM_DAYS, endpoint=True)
+issue_day = np.repeat(np.arange(NUM_DAYS), issues_per_day)
+issue_prod = inventory_rng.integers(0, n_products, size=issue_day.size)
+issue_qty = -inventory_rng.integers(1, 5, size=issue_day.size, endpoint=True) # Negative for issues
+
+# Random Receipts (Replenishment)
+receipt_day = np.flatnonzero(inventory_rng.random(NUM_DAYS) < 0.15) # 15% chance of receipt
+receipt_prod = inventory_rng.integers(0, n_products, size=receipt_day.size)
+receipt_qty = inventory_rng.integers(product_moqs[receipt_prod], product_moqs[receipt_prod] * 3, endpoint=True)
+receipt_cost = product_costs[receipt_prod] * inventory_rng.uniform(0.95, 1.05, size=receipt_day.size) # Slight cost variation
+
+n_init, n_issues, n_receipts = init_prod.size, issue_day.size, receipt_day.size
+day = np.concatenate([np.zeros(n_init, dtype=int), issue_day, receipt_day])
+kind = np.repeat([0, 1, 2], [n_init, n_issues, n_receipts])
+no_reference = np.full(n_issues, "")
+purchase_orders = np.concatenate([make_ids("PO", inventory_rng.integers(1000, 9999, size=n_init, endpoint=True)), no_reference,
+                                  make_ids("PO", inventory_rng.integers(10000, 99999, size=n_receipts, endpoint=True))])
+batch_numbers = np.concatenate([make_ids("B", inventory_rng.integers(100, 999, size=n_init, endpoint=True)), no_reference,
+                                make_ids("B", inventory_rng.integers(1000, 9999, size=n_receipts, endpoint=True))])
+
+df_inv = pd.DataFrame({
+    "Date": START_DATE + pd.to_timedelta(day, unit="D"),
+    "ProductID": product_ids[np.concatenate([init_prod, issue_prod, receipt_prod])],
+    "Quantity": np.concatenate([init_qty, issue_qty, receipt_qty]).astype(np.int16),
+    "Type": np.array(["Receipt", "Issue", "Receipt"])[kind],
+    "PurchaseOrderID": purchase_orders,
+    "BatchNumber": batch_numbers,
+    "UnitCost": np.concatenate([product_costs[init_prod], product_costs[issue_prod], receipt_cost])
+})
+
+# Same row order as a day-by-day simulation: each day's issues come before its receipt
+df_inv = df_inv.iloc[np.lexsort((kind, day))].reset_index(drop=True)
+df_inv.insert(0, "TransactionID", make_ids("TX", np.arange(1, len(df_inv) + 1), 6))
+df_inv = categorize(df_inv)
+write_csv(df_inv, "Fact_Inventory_Transactions.csv", date_columns=["Date"])
+write_sql(df_inv, "Fact_Inventory_Transactions")
+write_parquet(df_inv, "Fact_Inventory_Transactions.parquet")
 print("Generated Fact_Inventory_Transactions.csv")
 
 # 6. Fact_Maintenance_WorkOrders (Enriched with Delays)
-work_orders = []
-wo_id = 1
-current_date = START_DATE
-failure_codes = ["MECH01", "ELEC02", "HYDR03", "OPER04", "TIRE05"]
-
-while current_date <= END_DATE:
-    # Random Work Orders
-    if random.random() < 0.5: # 50% chance of a work order
-        eq = random.choice(equipment)
-        tech = random.choice(technicians)
-        is_preventive = random.random() < 0.65 
-        
-        if is_preventive:
-            m_type = "Preventive"
-            downtime = random.uniform(2, 8)
-            labor_hours = random.uniform(2, 6)
-            parts_cost = random.randint(500, 2000)
-            failure_code = ""
-            # Scheduled date logic
-            scheduled_date = current_date - timedelta(days=random.randint(1, 7))
-        else:
-            m_type = "Breakdown"
-            downtime = random.uniform(4, 48)
-            labor_hours = random.uniform(4, 20)
-            parts_cost = random.randint(5000, 25000)
-            failure_code = random.choice(failure_codes)
-            scheduled_date = None
-            
-        labor_cost = labor_hours * tech["HourlyRate"]
-        total_cost = parts_cost + labor_cost
-        
-        # New: Simulate Delays
-        delay_min = 0
-        if random.random() < 0.2: # 20% chance of delay
-            delay_min = random.randint(30, 240)
-            
-        work_orders.append({
-            "WorkOrderID": f"WO{wo_id:05d}",
-            "EquipmentID": eq["EquipmentID"],
-            "TechnicianID": tech["TechnicianID"],
-            "Date": current_date.strftime("%Y-%m-%d"),
-            "ScheduledDate": scheduled_date.strftime("%Y-%m-%d") if scheduled_date else "",
-            "MaintenanceType": m_type,
-            "FailureCode": failure_code,
-            "DowntimeHours": round(downtime, 2),
-            "Planned Downtime": round(downtime, 2) if is_preventive else 0,
-            "Unplanned Downtime": round(downtime, 2) if not is_preventive else 0,
-            "LaborHours": round(labor_hours, 2),
-            "PartsCost": round(parts_cost, 2),
-            "LaborCost": round(labor_cost, 2),
-            "TotalCost": round(total_cost, 2),
-            "DelayMinutes": delay_min,
-            "RestockingDelay": 1 if delay_min > 60 else 0
-        })
-        wo_id += 1
-    current_date += timedelta(days=1)
-
-df_wo = pd.DataFrame(work_orders)
-df_wo.to_csv(f"{OUTPUT_DIR}/Fact_Maintenance_WorkOrders.csv", index=False)
+failure_codes = np.array(["MECH01", "ELEC02", "HYDR03", "OPER04", "TIRE05"])
+technician_ids = np.array([t["TechnicianID"] for t in technicians])
+technician_rates = np.array([t["HourlyRate"] for t in technicians], dtype=float)
+equipment_ids = np.array([e["EquipmentID"] for e in equipment])
+
+# Random Work Orders: 50% chance of one per day; attributes are drawn for every order at once
+wo_day = np.flatnonzero(wo_rng.random(NUM_DAYS) < 0.5)
+n_wo = len(wo_day)
+wo_eq = wo_rng.integers(0, len(equipment), size=n_wo)
+wo_tech = wo_rng.integers(0, len(technicians), size=n_wo)
+wo_preventive = wo_rng.random(n_wo) < 0.65
+
+# Preventive vs Breakdown ranges, selected per order
+wo_downtime = np.where(wo_preventive, wo_rng.uniform(2, 8, size=n_wo), wo_rng.uniform(4, 48, size=n_wo))
+wo_labor_hours = np.where(wo_preventive, wo_rng.uniform(2, 6, size=n_wo), wo_rng.uniform(4, 20, size=n_wo))
+wo_parts_cost = np.where(wo_preventive, wo_rng.integers(500, 2000, size=n_wo, endpoint=True),
+                         wo_rng.integers(5000, 25000, size=n_wo, endpoint=True))
+wo_failure_code = wo_rng.integers(0, len(failure_codes), size=n_wo) # used for breakdowns only
+# Scheduled date logic (preventive only)
+wo_scheduled_offset = wo_rng.integers(1, 7, size=n_wo, endpoint=True)
+
+# New: Simulate Delays (20% chance of a 30-240 min delay), drawn for all orders without branching
+wo_delay = np.where(wo_rng.random(n_wo) < 0.2, wo_rng.integers(30, 240, size=n_wo, endpoint=True), 0)
+
+# Labor cost for every order at once: gather each order's technician rate, then one multiply
+wo_labor_cost = wo_labor_hours * technician_rates[wo_tech]
+
+wo_date = START_DATE + pd.to_timedelta(wo_day, unit="D")
+downtime_hours = np.round(wo_downtime, 2)
+df_wo = pd.DataFrame({
+    "WorkOrderID": make_ids("WO", np.arange(1, n_wo + 1), 5),
+    "EquipmentID": equipment_ids[wo_eq],
+    "TechnicianID": technician_ids[wo_tech],
+    "Date": wo_date,
+    "ScheduledDate": (wo_date - pd.to_timedelta(np.where(wo_preventive, wo_scheduled_offset, 0), unit="D"))
+                     .where(wo_preventive), # NaT -> blank in the CSV
+    "MaintenanceType": np.where(wo_preventive, "Preventive", "Breakdown"),
+    "FailureCode": np.where(wo_preventive, "", failure_codes[wo_failure_code]),
+    "DowntimeHours": downtime_hours,
+    "Planned Downtime": np.where(wo_preventive, downtime_hours, 0),
+    "Unplanned Downtime": np.where(wo_preventive, 0, downtime_hours),
+    "LaborHours": np.round(wo_labor_hours, 2),
+    "PartsCost": wo_parts_cost.astype(np.int32),
+    "LaborCost": np.round(wo_labor_cost, 2),
+    "TotalCost": np.round(wo_parts_cost + wo_labor_cost, 2),
+    "DelayMinutes": wo_delay.astype(np.int16),
+    "RestockingDelay": (wo_delay > 60).astype(np.int8)
+})
+df_wo = categorize(df_wo)
+# Dates stay datetime until here; the writer formats whole columns in one pass
+write_csv(df_wo, "Fact_Maintenance_WorkOrders.csv", date_columns=["Date", "ScheduledDate"])
+write_sql(df_wo, "Fact_Maintenance_WorkOrders")
+write_parquet(df_wo, "Fact_Maintenance_WorkOrders.parquet")
 print("Generated Fact_Maintenance_WorkOrders.csv")
 
 
 # 7. Fact_Production_Data (NEW - for OEE)
 print("Generating Daily Production Data...")
-production_data = []
-# Create a quick lookup for downtime: { (Date, EquipmentID): DowntimeHours }
-downtime_lookup = {}
-for wo in work_orders:
-    key = (wo["Date"], wo["EquipmentID"])
-    downtime_lookup[key] = downtime_lookup.get(key, 0) + wo["DowntimeHours"]
-
-current_date = START_DATE
-while current_date <= END_DATE:
-    date_str = current_date.strftime("%Y-%m-%d")
-    for eq in equipment:
-        eq_id = eq["EquipmentID"]
-
-        # Get downtime for the day
-        downtime_hours = downtime_lookup.get((date_str, eq_id), 0)
-
-        # OEE Calculation Parameters
-        ideal_cycle_time_s = random.randint(110, 130) # seconds per part
-        total_scheduled_hours = 24
-
-        # Availability
-        operating_hours = max(0, total_scheduled_hours - downtime_hours)
-
-        # Performance
-        # Simulate minor stops and reduced speed
-        performance_factor = random.uniform(0.90, 0.98) if operating_hours > 0 else 0
-        effective_operating_hours = operating_hours * performance_factor
-
-        total_parts_produced = int((effective_operating_hours * 3600) / ideal_cycle_time_s)
-
-        # Quality
-        quality_factor = random.uniform(0.95, 0.995) if total_parts_produced > 0 else 0
-        good_parts_produced = int(total_parts_produced * quality_factor)
-
-        production_data.append({
-            "Date": date_str,
-            "EquipmentID": eq_id,
-            "TotalPartsProduced": total_parts_produced,
-            "GoodPartsProduced": good_parts_produced,
-            "DowntimeHours": round(downtime_hours, 2),
-            "OperatingHours": round(operating_hours, 2),
-            "IdealCycleTime_s": ideal_cycle_time_s
-        })
-
-    current_date += timedelta(days=1)
-
-df_prod = pd.DataFrame(production_data)
-df_prod.to_csv(f"{OUTPUT_DIR}/Fact_Production_Data.csv", index=False)
+# One row per (day, equipment)
+production_dates = pd.date_range(START_DATE, END_DATE, freq="D")
+n_rows = len(production_dates) * len(equipment)
+
+# Get downtime for the day: work-order downtime summed per (Date, EquipmentID), 0 where none
+daily_downtime = df_wo.groupby(["Date", "EquipmentID"], observed=True)["DowntimeHours"].sum()
+prod_downtime = daily_downtime.reindex(pd.MultiIndex.from_product([production_dates, equipment_ids]),
+                                       fill_value=0).to_numpy(dtype=float)
+
+# OEE Calculation Parameters, drawn for every row up front
+cycle_times = production_rng.integers(110, 130, size=n_rows, endpoint=True) # seconds per part
+performance_draws = production_rng.uniform(0.90, 0.98, size=n_rows)
+quality_draws = production_rng.uniform(0.95, 0.995, size=n_rows)
+total_scheduled_hours = 24
+
+# Availability
+prod_operating = np.maximum(0, total_scheduled_hours - prod_downtime)
+
+# Performance
+# Simulate minor stops and reduced speed
+performance_factor = np.where(prod_operating > 0, performance_draws, 0)
+effective_operating_hours = prod_operating * performance_factor
+total_parts = ((effective_operating_hours * 3600) / cycle_times).astype(np.int64) # truncates like int()
+
+# Quality
+quality_factor = np.where(total_parts > 0, quality_draws, 0)
+good_parts = (total_parts * quality_factor).astype(np.int64)
+
+df_prod = pd.DataFrame({
+    "Date": production_dates.repeat(len(equipment)),
+    "EquipmentID": np.tile(equipment_ids, len(production_dates)),
+    "TotalPartsProduced": total_parts.astype(np.int16),
+    "GoodPartsProduced": good_parts.astype(np.int16),
+    "DowntimeHours": np.round(prod_downtime, 2),
+    "OperatingHours": np.round(prod_operating, 2),
+    "IdealCycleTime_s": cycle_times.astype(np.int16)
+})
+df_prod = categorize(df_prod)
+write_csv(df_prod, "Fact_Production_Data.csv", date_columns=["Date"])
+write_sql(df_prod, "Fact_Production_Data")
+write_parquet(df_prod, "Fact_Production_Data.parquet")
 print("Generated Fact_Production_Data.csv")
 
 
 # 8. Fact_Budget_vs_Actual (Replaces Fact_Costs)
-budget_data = []
 cost_centers = ["CC_Maint_Heavy", "CC_Maint_Plant", "CC_Ops_Mining", "CC_Ops_Process"]
 gl_accounts = ["GL_5001_Spares", "GL_5002_Labor", "GL_5003_Contractors", "GL_5004_Consumables"]
 
-current_month = START_DATE.replace(day=1)
-while current_month <= END_DATE:
-    month_str = current_month.strftime("%Y-%m-01")
-    
-    for cc in cost_centers:
-        for gl in gl_accounts:
-            budget = random.randint(10000, 50000)
-            actual = budget * random.uniform(0.8, 1.2) # +/- 20% variance
-            
-            budget_data.append({
-                "Date": month_str,
-                "CostCenter": cc,
-                "GLAccount": gl,
-                "BudgetAmount": round(budget, 2),
-                "ActualAmount": round(actual, 2)
-            })
-            
-    # Move to next month
-    if current_month.month == 12:
-        current_month = current_month.replace(year=current_month.year + 1, month=1)
-    else:
-        current_month = current_month.replace(month=current_month.month + 1)
-
-df_budget = pd.DataFrame(budget_data)
-df_budget.to_csv(f"{OUTPUT_DIR}/Fact_Budget_vs_Actual.csv", index=False)
+# Every month x cost center x GL account, as one Cartesian product
+months = pd.date_range(START_DATE.replace(day=1), END_DATE, freq="MS")
+budget_index = pd.MultiIndex.from_product([months, cost_centers, gl_accounts], names=["Date", "CostCenter", "GLAccount"])
+budget_amounts = budget_rng.integers(10000, 50000, size=len(budget_index), endpoint=True)
+actual_amounts = budget_amounts * budget_rng.uniform(0.8, 1.2, size=len(budget_index)) # +/- 20% variance
+
+df_budget = pd.DataFrame({
+    "BudgetAmount": budget_amounts.astype(np.int32),
+    "ActualAmount": np.round(actual_amounts, 2)
+}, index=budget_index).reset_index()
+df_budget = categorize(df_budget)
+write_csv(df_budget, "Fact_Budget_vs_Actual.csv", date_columns=["Date"])
+write_sql(df_budget, "Fact_Budget_vs_Actual")
+write_parquet(df_budget, "Fact_Budget_vs_Actual.parquet")
 print("Generated Fact_Budget_vs_Actual.csv")
 
 # 8. Fact_Sensor_Readings (Correlated Run-to-Failure Data)
@@ -299,84 +363,86 @@ print("Generated Fact_Budget_vs_Actual.csv")
 # - Post-Failure: Reset to baseline
 
 print("Generating Correlated Sensor Data...")
-sensor_readings = []
 eq_list = [e for e in equipment if e["Criticality"] == "High"]
 high_crit_ids = set(e["EquipmentID"] for e in eq_list)
 
 # Convert Work Orders to a lookup dict for faster processing
-# Dict structure: EquipmentID -> list of (FailureDate, Type)
-wo_lookup = {eid: [] for eid in high_crit_ids}
-for wo in work_orders:
-    if wo["EquipmentID"] in high_crit_ids and wo["MaintenanceType"] == "Breakdown":
-        fail_date = datetime.strptime(wo["Date"], "%Y-%m-%d")
-        wo_lookup[wo["EquipmentID"]].append(fail_date)
-
-# Sort failure dates
-for eid in wo_lookup:
-    wo_lookup[eid].sort()
-
-current_ts = START_DATE # Generate for full period
-FREQ_HOURS = 4
+# Dict structure: EquipmentID -> sorted array of FailureDates
+breakdowns = df_wo[df_wo["MaintenanceType"] == "Breakdown"]
+wo_lookup = {eid: np.sort(breakdowns.loc[breakdowns["EquipmentID"] == eid, "Date"].to_numpy())
+             for eid in high_crit_ids}
 
-while current_ts <= END_DATE:
-    for eq in eq_list:
-        eid = eq["EquipmentID"]
-        
-        # Base healthy values
-        base_temp = 75 
-        base_vib = 2.5
-        
-        # Check if we are approaching a failure
-        days_to_failure = 999
-        upcoming_failure = None
-        
-        for f_date in wo_lookup[eid]:
-            if f_date > current_ts:
-                delta = (f_date - current_ts).total_seconds() / 86400 # days
-                if delta < 20: # Start looking 20 days out
-                    days_to_failure = delta
-                    upcoming_failure = f_date
-                    break
-        
-        # Degradation Logic
-        if days_to_failure < 14: # Degradation starts 14 days before
-            # Exponential degradation factor (0 to 1 scale roughly)
-            factor = np.exp((14 - days_to_failure) / 4) - 1
-            # Cap factor to avoid absurd values
-            factor = min(factor, 50) 
-            
-            # Add degradation to base
-            temp_reading = base_temp + (factor * 2.5) + random.uniform(-2, 2)
-            vib_reading = base_vib + (factor * 0.5) + random.uniform(-0.2, 0.2)
-            is_failure_imminent = True
-        else:
-            # Healthy State
-            temp_reading = base_temp + random.uniform(-5, 5)
-            vib_reading = base_vib + random.uniform(-0.5, 0.5)
-            is_failure_imminent = False
-            
-        # occasional anomalies unrelated to failure (False Positives)
-        if not is_failure_imminent and random.random() < 0.005:
-             temp_reading += random.uniform(10, 20)
-             
-        # Normalize/Clip
-        temp_reading = max(0, round(temp_reading, 1))
-        vib_reading = max(0, round(vib_reading, 2))
-            
-        sensor_readings.append({
-            "Timestamp": current_ts.strftime("%Y-%m-%d %H:%M:%S"),
-            "EquipmentID": eid,
-            "Temperature_C": temp_reading,
-            "Vibration_mm_s": vib_reading,
-            "Status": "Alert" if (temp_reading > 95 or vib_reading > 5) else "Normal",
-            # Useful for training (Target Label), but ideally we calculate this in prep
-            "_RUL_Days": round(days_to_failure, 2) if days_to_failure < 999 else 999 
-        })
-        
-    current_ts += timedelta(hours=FREQ_HOURS)
-
-df_sensor = pd.DataFrame(sensor_readings)
+FREQ_HOURS = 4
+timestamps = pd.date_range(START_DATE, END_DATE, freq=f"{FREQ_HOURS}h") # Generate for full period
+T, E = len(timestamps), len(eq_list)
+ts = timestamps.values
+
+# Days to the next failure, one (T, E) grid: timestep-major, equipment-minor like the readings
+days_to_failure = np.full((T, E), 999.0)
+for j, eq in enumerate(eq_list):
+    fail_dates = wo_lookup[eq["EquipmentID"]]
+    if len(fail_dates) == 0: # No breakdowns: healthy for the whole period
+        continue
+    nxt = np.searchsorted(fail_dates, ts, side="right") # first failure strictly after ts
+    has_next = nxt < len(fail_dates)
+    delta = (fail_dates[np.minimum(nxt, len(fail_dates) - 1)] - ts) / np.timedelta64(1, "D")
+    in_window = has_next & (delta < 20) # Start looking 20 days out
+    days_to_failure[in_window, j] = delta[in_window]
+
+# Base healthy values
+base_temp = 75
+base_vib = 2.5
+
+# Degradation starts 14 days before; exponential factor capped to avoid absurd values
+is_failure_imminent = days_to_failure < 14
+factor = np.minimum(np.exp((14 - np.where(is_failure_imminent, days_to_failure, 14)) / 4) - 1, 50)
+
+temp = base_temp + np.where(is_failure_imminent,
+                            factor * 2.5 + sensor_rng.uniform(-2, 2, size=(T, E)),
+                            sensor_rng.uniform(-5, 5, size=(T, E)))
+vib = base_vib + np.where(is_failure_imminent,
+                          factor * 0.5 + sensor_rng.uniform(-0.2, 0.2, size=(T, E)),
+                          sensor_rng.uniform(-0.5, 0.5, size=(T, E)))
+
+# occasional anomalies unrelated to failure (False Positives)
+anomaly = ~is_failure_imminent & (sensor_rng.random((T, E)) < 0.005)
+temp[anomaly] += sensor_rng.uniform(10, 20, size=anomaly.sum())
+
+# Normalize/Clip
+temp = np.maximum(0, np.round(temp, 1)).ravel()
+vib = np.maximum(0, np.round(vib, 2)).ravel()
+rul = days_to_failure.ravel()
+
+df_sensor = pd.DataFrame({
+    "Timestamp": np.repeat(ts, E),
+    "EquipmentID": np.tile([e["EquipmentID"] for e in eq_list], T),
+    "Temperature_C": temp.astype(np.float32),
+    "Vibration_mm_s": vib.astype(np.float32),
+    "Status": np.where((temp > 95) | (vib > 5), "Alert", "Normal"),
+    # Useful for training (Target Label), but ideally we calculate this in prep
+    "_RUL_Days": np.where(rul < 999, np.round(rul, 2), 999).astype(np.float32)
+})
 # Drop the helper column if you want strictly raw data, but keeping it helps quick validation
 # df_sensor.drop(columns=["_RUL_Days"], inplace=True)
-df_sensor.to_csv(f"{OUTPUT_DIR}/Fact_Sensor_Readings.csv", index=False)
+df_sensor = categorize(df_sensor)
+write_csv(df_sensor, "Fact_Sensor_Readings.csv")
+write_sql(df_sensor, "Fact_Sensor_Readings",
+          decimals={"Temperature_C": 1, "Vibration_mm_s": 2, "_RUL_Days": 2})
+# On-disk types match the frame: second timestamps, dictionary-coded IDs/status, float32 readings
+sensor_schema = pa.schema([
+    ("Timestamp", pa.timestamp("s")),
+    ("EquipmentID", pa.dictionary(pa.int8(), pa.string())),
+    ("Temperature_C", pa.float32()),
+    ("Vibration_mm_s", pa.float32()),
+    ("Status", pa.dictionary(pa.int8(), pa.string())),
+    ("_RUL_Days", pa.float32()),
+])
+write_parquet(df_sensor, "Fact_Sensor_Readings.parquet", schema=sensor_schema)
 print(f"Generated Fact_Sensor_Readings.csv with {len(df_sensor)} rows")
+
+# Wait for the queued writes; result() re-raises any write error
+for future in pending_writes:
+    future.result()
+csv_writer.shutdown()
+db_writer.shutdown()
+print("All data files written")
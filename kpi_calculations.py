@@ -4,39 +4,133 @@ Centralized business logic for maintenance, inventory, and cost KPIs.
 Domain: Cement / Mining / Heavy Equipment Operations
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from datetime import datetime, timedelta
 
+try:
+    import numba
+except ImportError:
+    # Numba is optional; breakdown groupbys stay on the pandas Cython path
+    numba = None
+
+# The numba groupby engine JIT-compiles on first use (seconds), so it only pays off on large frames
+NUMBA_GROUPBY_MIN_ROWS = 250_000
+
+# Below this many work order + transaction rows, thread start-up costs more than the KPI passes
+PARALLEL_KPI_MIN_ROWS = 50_000
+
+
+# =============================================================================
+# DATA LOADING
+# =============================================================================
+
+def data_version(data_dir: str) -> float:
+    """
+    Latest modification time of the CSV and Parquet files in the data directory.
+    The dashboard's cached loaders take this as an argument, so regenerating
+    or reprocessing the data invalidates their cache instead of serving stale frames.
+    Parquet counts too: read_fact_table prefers it, and it can land after its CSV.
+    """
+    if not os.path.isdir(data_dir):
+        return 0.0
+    return max((entry.stat().st_mtime for entry in os.scandir(data_dir)
+                if entry.is_file() and entry.name.endswith(('.csv', '.parquet'))), default=0.0)
+
+
+def read_fact_table(data_dir: str, table: str, columns: list = None,
+                    dtype: dict = None, date_columns: list = None) -> pd.DataFrame:
+    """
+    Read a table written by generate_data.py or preprocess_data.py, loading only the requested columns.
+    Prefers the typed Parquet copy. The CSV fallback (the only path on a fresh clone, since the
+    Parquet copies are not committed) goes through pyarrow's multithreaded reader with date_columns
+    typed as timestamps at parse time. dtype is applied to both paths, so either way the same types come back.
+    """
+    parquet_path = os.path.join(data_dir, f"{table}.parquet")
+    if os.path.exists(parquet_path):
+        df = pd.read_parquet(parquet_path, columns=columns)
+    else:
+        # Dates are typed in the reader itself; read_csv(engine='pyarrow', parse_dates=...) hands
+        # blank cells back as strings, which would leave e.g. ScheduledDate as object dtype
+        convert_options = pacsv.ConvertOptions(
+            include_columns=columns,
+            column_types={column: pa.timestamp('s') for column in date_columns or []},
+            strings_can_be_null=True
+        )
+        df = pacsv.read_csv(os.path.join(data_dir, f"{table}.csv"),
+                            convert_options=convert_options).to_pandas(coerce_temporal_nanoseconds=True)
+    casts = {column: kind for column, kind in (dtype or {}).items()
+             if column in df and df[column].dtype != kind}
+    return df.astype(casts) if casts else df
+
 
 # =============================================================================
 # MAINTENANCE KPIs
 # =============================================================================
 
-def calculate_mttr(df_wo: pd.DataFrame, group_by: str = 'EquipmentID') -> pd.DataFrame:
+def calculate_reliability_stats(df_wo: pd.DataFrame, group_by: str = 'EquipmentID',
+                                days: float = 365, breakdown_wo: pd.DataFrame = None) -> pd.DataFrame:
     """
-    Calculate Mean Time To Repair (MTTR) per equipment.
+    Calculate MTTR and MTBF per equipment from one groupby over the breakdown work orders.
     MTTR = Average downtime hours for breakdown work orders.
+    MTBF = (Total Operating Hours - Total Unplanned Downtime) / Number of Failures
     
     Args:
         df_wo: Work orders dataframe with DowntimeHours, MaintenanceType columns
         group_by: Column to group by (default: EquipmentID)
+        days: Number of days in the period
+        breakdown_wo: Breakdown rows of df_wo when the caller has already filtered them
     
     Returns:
-        DataFrame with MTTR per group
+        DataFrame with MTTR_Hours, Breakdown_Count, Total_Downtime and MTBF_Hours per group,
+        indexed by the group_by key (empty when there are no breakdowns)
     """
-    breakdown_wo = df_wo[df_wo['MaintenanceType'] == 'Breakdown'].copy()
+    total_operating_hours = days * 24
+    if breakdown_wo is None:
+        breakdown_wo = df_wo[df_wo['MaintenanceType'] == 'Breakdown']
+    
+    if numba is not None and len(breakdown_wo) >= NUMBA_GROUPBY_MIN_ROWS:
+        downtime = breakdown_wo.groupby(group_by, observed=True, sort=False)['DowntimeHours']
+        stats = pd.DataFrame({
+            'MTTR_Hours': downtime.mean(engine='numba'),
+            'Breakdown_Count': breakdown_wo.groupby(group_by, observed=True, sort=False)['WorkOrderID'].count(),
+            'Total_Downtime': downtime.sum(engine='numba')
+        })
+    else:
+        stats = breakdown_wo.groupby(group_by, observed=True, sort=False).agg(
+            MTTR_Hours=('DowntimeHours', 'mean'),
+            Breakdown_Count=('WorkOrderID', 'count'),
+            Total_Downtime=('DowntimeHours', 'sum')
+        )
     
-    if breakdown_wo.empty:
-        return pd.DataFrame({group_by: [], 'MTTR_Hours': []})
+    # Groups come out in first-seen order; sorting the small result keeps the output deterministic
+    stats = stats.sort_index()
     
-    mttr = breakdown_wo.groupby(group_by).agg(
-        MTTR_Hours=('DowntimeHours', 'mean'),
-        Breakdown_Count=('WorkOrderID', 'count'),
-        Total_Downtime=('DowntimeHours', 'sum')
-    ).reset_index()
+    # MTBF = (Operating Time - Unplanned Downtime) / Failures
+    stats['MTBF_Hours'] = (total_operating_hours - stats['Total_Downtime']) / stats['Breakdown_Count']
+    stats['MTBF_Hours'] = stats['MTBF_Hours'].clip(lower=0)
     
-    return mttr
+    return stats
+
+
+def calculate_mttr(df_wo: pd.DataFrame, group_by: str = 'EquipmentID') -> pd.DataFrame:
+    """
+    Calculate Mean Time To Repair (MTTR) per equipment.
+    MTTR = Average downtime hours for breakdown work orders.
+    
+    Args:
+        df_wo: Work orders dataframe with DowntimeHours, MaintenanceType columns
+        group_by: Column to group by (default: EquipmentID)
+    
+    Returns:
+        DataFrame with MTTR per group, indexed by the group_by key
+    """
+    stats = calculate_reliability_stats(df_wo, group_by)
+    return stats[['MTTR_Hours', 'Breakdown_Count', 'Total_Downtime']]
 
 
 def calculate_mtbf(df_wo: pd.DataFrame, group_by: str = 'EquipmentID', 
@@ -51,26 +145,10 @@ def calculate_mtbf(df_wo: pd.DataFrame, group_by: str = 'EquipmentID',
         days: Number of days in the period
     
     Returns:
-        DataFrame with MTBF per group
+        DataFrame with MTBF per group, indexed by the group_by key
     """
-    total_operating_hours = days * 24
-    breakdown_wo = df_wo[df_wo['MaintenanceType'] == 'Breakdown'].copy()
-    
-    if breakdown_wo.empty:
-        # If no breakdowns, MTBF is the full operating time (or infinite, but we'll cap it at total hours)
-        # We need all equipment IDs that were in the original filtered set if possible
-        return pd.DataFrame({group_by: [], 'MTBF_Hours': [], 'Failure_Count': []})
-    
-    stats = breakdown_wo.groupby(group_by).agg(
-        Failure_Count=('WorkOrderID', 'count'),
-        Total_Unplanned_Downtime=('DowntimeHours', 'sum')
-    ).reset_index()
-    
-    # MTBF = (Operating Time - Unplanned Downtime) / Failures
-    stats['MTBF_Hours'] = (total_operating_hours - stats['Total_Unplanned_Downtime']) / stats['Failure_Count']
-    stats['MTBF_Hours'] = stats['MTBF_Hours'].clip(lower=0) 
-    
-    return stats[[group_by, 'MTBF_Hours', 'Failure_Count']]
+    stats = calculate_reliability_stats(df_wo, group_by, days)
+    return stats[['MTBF_Hours', 'Breakdown_Count']].rename(columns={'Breakdown_Count': 'Failure_Count'})
 
 
 def calculate_equipment_availability(df_wo: pd.DataFrame, 
@@ -120,24 +198,19 @@ def calculate_schedule_compliance(df_wo: pd.DataFrame) -> dict:
     Returns:
         Dictionary with compliance metrics
     """
-    # Filter for preventive WOs with a schedule date
-    scheduled_wo = df_wo[
-        (df_wo['MaintenanceType'] == 'Preventive') & 
-        (df_wo['ScheduledDate'].notna()) & 
-        (df_wo['ScheduledDate'] != '')
-    ].copy()
+    # Loaders parse both date columns once, which makes these no-ops; blank dates come through as NaT
+    actual = pd.to_datetime(df_wo['Date']).to_numpy()
+    scheduled = pd.to_datetime(df_wo['ScheduledDate']).to_numpy()
+    
+    # Preventive WOs with a schedule date
+    is_scheduled = (df_wo['MaintenanceType'] == 'Preventive').to_numpy() & ~np.isnat(scheduled)
+    total = int(is_scheduled.sum())
     
-    if scheduled_wo.empty:
+    if total == 0:
         return {'Compliance_Pct': 100.0, 'Late_Count': 0, 'OnTime_Count': 0, 'Total_Scheduled': 0}
-        
-    scheduled_wo['Date'] = pd.to_datetime(scheduled_wo['Date'])
-    scheduled_wo['ScheduledDate'] = pd.to_datetime(scheduled_wo['ScheduledDate'])
     
     # Late if Actual Date > Scheduled Date + 1 day buffer
-    scheduled_wo['IsLate'] = scheduled_wo['Date'] > (scheduled_wo['ScheduledDate'] + pd.Timedelta(days=1))
-    
-    late_count = scheduled_wo['IsLate'].sum()
-    total = len(scheduled_wo)
+    late_count = int((actual[is_scheduled] > scheduled[is_scheduled] + np.timedelta64(1, 'D')).sum())
     ontime = total - late_count
     
     compliance = (ontime / total) * 100
@@ -153,25 +226,35 @@ def calculate_schedule_compliance(df_wo: pd.DataFrame) -> dict:
 def calculate_maintenance_mix(df_wo: pd.DataFrame) -> dict:
     """
     Calculate preventive vs breakdown maintenance ratio.
+    Accepts raw work orders or a build_work_order_rollup frame.
     
     Returns:
         Dictionary with maintenance type distribution
     """
-    type_counts = df_wo['MaintenanceType'].value_counts()
-    total = type_counts.sum()
+    # Rollup rows carry a pre-summed WorkOrderCount; raw work orders count one per row
+    count = ('WorkOrderCount', 'sum') if 'WorkOrderCount' in df_wo else ('TotalCost', 'size')
+    
+    # One grouped pass for counts, cost and downtime per type instead of a filter per metric
+    by_type = df_wo.groupby('MaintenanceType', observed=True, sort=False).agg(
+        Count=count,
+        Cost=('TotalCost', 'sum'),
+        Downtime=('DowntimeHours', 'sum')
+    )
+    total = by_type['Count'].sum()
+    by_type = by_type.reindex(['Preventive', 'Breakdown'], fill_value=0)
     
-    preventive = type_counts.get('Preventive', 0)
-    breakdown = type_counts.get('Breakdown', 0)
+    preventive = by_type.at['Preventive', 'Count']
+    breakdown = by_type.at['Breakdown', 'Count']
     
     return {
         'Preventive_Count': preventive,
         'Breakdown_Count': breakdown,
         'Preventive_Pct': round((preventive / total) * 100, 1) if total > 0 else 0,
         'Breakdown_Pct': round((breakdown / total) * 100, 1) if total > 0 else 0,
-        'Preventive_Cost': df_wo[df_wo['MaintenanceType'] == 'Preventive']['TotalCost'].sum(),
-        'Breakdown_Cost': df_wo[df_wo['MaintenanceType'] == 'Breakdown']['TotalCost'].sum(),
-        'Preventive_Downtime': df_wo[df_wo['MaintenanceType'] == 'Preventive']['DowntimeHours'].sum(),
-        'Breakdown_Downtime': df_wo[df_wo['MaintenanceType'] == 'Breakdown']['DowntimeHours'].sum()
+        'Preventive_Cost': by_type.at['Preventive', 'Cost'],
+        'Breakdown_Cost': by_type.at['Breakdown', 'Cost'],
+        'Preventive_Downtime': by_type.at['Preventive', 'Downtime'],
+        'Breakdown_Downtime': by_type.at['Breakdown', 'Downtime']
     }
 
 
@@ -179,7 +262,50 @@ def calculate_maintenance_mix(df_wo: pd.DataFrame) -> dict:
 # INVENTORY KPIs
 # =============================================================================
 
-def calculate_inventory_turnover(df_trans: pd.DataFrame, df_products: pd.DataFrame) -> pd.DataFrame:
+def calculate_issue_stats(df_trans: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregate issue transactions per product in one filter and groupby pass.
+    Shared by the turnover and coverage KPIs.
+    
+    Args:
+        df_trans: Inventory transactions dataframe (Date as datetime64 or strings)
+    
+    Returns:
+        DataFrame indexed by ProductID with Total_Issues, Issue_Value and Avg_Daily_Usage
+    """
+    # Get total issues (negative quantities = issues)
+    issues = df_trans[df_trans['Type'] == 'Issue']
+    # The inventory page precomputes the signed ValueChange at load; its magnitude is |Quantity| * UnitCost
+    if 'ValueChange' in issues:
+        issue_value = issues['ValueChange'].abs()
+    else:
+        issue_value = issues['Quantity'].abs() * issues['UnitCost']
+    
+    # The pages parse Date at load; raw read_csv frames still carry strings, so parse only then
+    issue_dates = issues['Date']
+    if not pd.api.types.is_datetime64_any_dtype(issue_dates):
+        issue_dates = pd.to_datetime(issue_dates)
+    # Span straight off the datetime64 buffer instead of boxing Timestamps
+    issue_dates = issue_dates.to_numpy()
+    date_range = 0
+    if len(issue_dates):
+        date_range = int((issue_dates.max() - issue_dates.min()) // np.timedelta64(1, 'D'))
+    date_range = date_range or 1
+    
+    # Group the column series directly rather than adding Issue_Value to a copy of the frame;
+    # native sum then abs, since a Python lambda would push groupby off its Cython path
+    by_product = issues['ProductID']
+    stats = pd.DataFrame({
+        'Total_Issues': issues['Quantity'].groupby(by_product, observed=True, sort=False).sum().abs(),
+        'Issue_Value': issue_value.groupby(by_product, observed=True, sort=False).sum()
+    })
+    stats['Avg_Daily_Usage'] = stats['Total_Issues'] / date_range
+    
+    return stats
+
+
+def calculate_inventory_turnover(df_trans: pd.DataFrame, df_products: pd.DataFrame,
+                                 issue_stats: pd.DataFrame = None) -> pd.DataFrame:
     """
     Calculate Inventory Turnover Ratio per product.
     Turnover = Total Issues (COGS proxy) / Average Inventory Value
@@ -187,23 +313,19 @@ def calculate_inventory_turnover(df_trans: pd.DataFrame, df_products: pd.DataFra
     Args:
         df_trans: Inventory transactions dataframe
         df_products: Products dimension with CurrentStock, UnitCost
+        issue_stats: Optional calculate_issue_stats(df_trans) result, to share it across KPIs
     
     Returns:
         DataFrame with turnover ratio per product
     """
-    # Get total issues (negative quantities = issues)
-    issues = df_trans[df_trans['Type'] == 'Issue'].copy()
-    issues['Issue_Value'] = abs(issues['Quantity']) * issues['UnitCost']
+    if issue_stats is None:
+        issue_stats = calculate_issue_stats(df_trans)
     
-    issue_totals = issues.groupby('ProductID').agg(
-        Total_Issues=('Quantity', lambda x: abs(x.sum())),
-        Issue_Value=('Issue_Value', 'sum')
-    ).reset_index()
-    
-    # Merge with products for average inventory
-    result = df_products[['ProductID', 'ProductName', 'CurrentStock', 'UnitCost']].merge(
-        issue_totals, on='ProductID', how='left'
-    ).fillna(0)
+    # Align the per-product totals to the products by index; products without issues get 0
+    result = df_products[['ProductID', 'ProductName', 'CurrentStock', 'UnitCost']].reset_index(drop=True)
+    totals = issue_stats.reindex(result['ProductID'].to_numpy(), fill_value=0)
+    result['Total_Issues'] = totals['Total_Issues'].to_numpy()
+    result['Issue_Value'] = totals['Issue_Value'].to_numpy()
     
     result['Avg_Inventory_Value'] = result['CurrentStock'] * result['UnitCost']
     result['Turnover_Ratio'] = np.where(
@@ -215,7 +337,8 @@ def calculate_inventory_turnover(df_trans: pd.DataFrame, df_products: pd.DataFra
     return result[['ProductID', 'ProductName', 'Total_Issues', 'Turnover_Ratio']]
 
 
-def calculate_stock_coverage_days(df_trans: pd.DataFrame, df_products: pd.DataFrame) -> pd.DataFrame:
+def calculate_stock_coverage_days(df_trans: pd.DataFrame, df_products: pd.DataFrame,
+                                  issue_stats: pd.DataFrame = None) -> pd.DataFrame:
     """
     Calculate Stock Coverage Days per product.
     Coverage Days = Current Stock / Average Daily Usage
@@ -223,25 +346,19 @@ def calculate_stock_coverage_days(df_trans: pd.DataFrame, df_products: pd.DataFr
     Args:
         df_trans: Inventory transactions dataframe
         df_products: Products dimension with CurrentStock
+        issue_stats: Optional calculate_issue_stats(df_trans) result, to share it across KPIs
     
     Returns:
         DataFrame with coverage days per product
     """
-    # Calculate average daily usage from issues
-    issues = df_trans[df_trans['Type'] == 'Issue'].copy()
-    issues['Date'] = pd.to_datetime(issues['Date'])
-    
-    date_range = (issues['Date'].max() - issues['Date'].min()).days or 1
-    
-    daily_usage = issues.groupby('ProductID').agg(
-        Total_Usage=('Quantity', lambda x: abs(x.sum()))
-    ).reset_index()
-    daily_usage['Avg_Daily_Usage'] = daily_usage['Total_Usage'] / date_range
+    if issue_stats is None:
+        issue_stats = calculate_issue_stats(df_trans)
     
-    # Merge with products
-    result = df_products[['ProductID', 'ProductName', 'CurrentStock', 'ReorderPoint']].merge(
-        daily_usage, on='ProductID', how='left'
-    ).fillna(0)
+    # Align daily usage to the products by index; products without issues get 0
+    result = df_products[['ProductID', 'ProductName', 'CurrentStock', 'ReorderPoint']].reset_index(drop=True)
+    result['Avg_Daily_Usage'] = issue_stats['Avg_Daily_Usage'].reindex(
+        result['ProductID'].to_numpy(), fill_value=0
+    ).to_numpy()
     
     result['Coverage_Days'] = np.where(
         result['Avg_Daily_Usage'] > 0,
@@ -250,17 +367,12 @@ def calculate_stock_coverage_days(df_trans: pd.DataFrame, df_products: pd.DataFr
     )
     
     # Status based on coverage
-    def get_coverage_status(days):
-        if days == np.inf:
-            return 'No Usage'
-        elif days <= 7:
-            return 'Critical'
-        elif days <= 30:
-            return 'Warning'
-        else:
-            return 'Healthy'
-    
-    result['Coverage_Status'] = result['Coverage_Days'].apply(get_coverage_status)
+    days = result['Coverage_Days'].to_numpy()
+    result['Coverage_Status'] = np.select(
+        [days == np.inf, days <= 7, days <= 30],
+        ['No Usage', 'Critical', 'Warning'],
+        default='Healthy'
+    )
     
     return result[['ProductID', 'ProductName', 'CurrentStock', 'Avg_Daily_Usage', 
                    'Coverage_Days', 'Coverage_Status']]
@@ -277,8 +389,9 @@ def get_reorder_alerts(df_products: pd.DataFrame) -> pd.DataFrame:
     
     if not alerts.empty:
         alerts['Shortage_Qty'] = alerts['ReorderPoint'] - alerts['CurrentStock']
-        alerts['Reorder_Qty'] = alerts[['Shortage_Qty', 'MOQ']].max(axis=1)
-        alerts['Estimated_Cost'] = alerts['Reorder_Qty'] * alerts['UnitCost']
+        reorder_qty = np.maximum(alerts['Shortage_Qty'].to_numpy(), alerts['MOQ'].to_numpy())
+        alerts['Reorder_Qty'] = reorder_qty
+        alerts['Estimated_Cost'] = reorder_qty * alerts['UnitCost'].to_numpy()
     
     return alerts
 
@@ -298,25 +411,18 @@ def calculate_payment_variance(df_costs: pd.DataFrame) -> pd.DataFrame:
     Returns:
         DataFrame with variance analysis per vendor
     """
-    variance = df_costs.groupby('VendorID').agg(
+    variance = df_costs.groupby('VendorID', observed=True, sort=False).agg(
         Total_Contract=('ContractValue', 'sum'),
         Total_Actual=('ActualPayment', 'sum'),
         Transaction_Count=('CostID', 'count')
-    ).reset_index()
+    ).sort_index().reset_index()
     
     variance['Variance'] = variance['Total_Actual'] - variance['Total_Contract']
     variance['Variance_Pct'] = (variance['Variance'] / variance['Total_Contract']) * 100
     
     # Status based on variance
-    def get_variance_status(pct):
-        if pct > 5:
-            return 'Over Budget'
-        elif pct < -5:
-            return 'Under Budget'
-        else:
-            return 'On Track'
-    
-    variance['Status'] = variance['Variance_Pct'].apply(get_variance_status)
+    pct = variance['Variance_Pct'].to_numpy()
+    variance['Status'] = np.select([pct > 5, pct < -5], ['Over Budget', 'Under Budget'], default='On Track')
     
     return variance
 
@@ -331,10 +437,10 @@ def calculate_budget_adherence(df_budget: pd.DataFrame) -> pd.DataFrame:
     Returns:
         DataFrame with budget adherence metrics
     """
-    adherence = df_budget.groupby(['CostCenter', 'GLAccount']).agg(
+    adherence = df_budget.groupby(['CostCenter', 'GLAccount'], observed=True, sort=False).agg(
         Total_Budget=('BudgetAmount', 'sum'),
         Total_Actual=('ActualAmount', 'sum')
-    ).reset_index()
+    ).sort_index().reset_index()
     
     adherence['Variance'] = adherence['Total_Actual'] - adherence['Total_Budget']
     adherence['Variance_Pct'] = (adherence['Variance'] / adherence['Total_Budget']) * 100
@@ -356,26 +462,83 @@ def calculate_all_kpis(df_wo: pd.DataFrame, df_trans: pd.DataFrame,
     Returns:
         Dictionary with all KPI results
     """
+    # One task per input frame; the pandas/NumPy kernels release the GIL, so threads overlap
+    tasks = [
+        (_work_order_kpis, (df_wo,)),
+        (_inventory_kpis, (df_trans, df_products)),
+        (_cost_kpis, (df_costs, df_budget)),
+    ]
+    if len(df_wo) + len(df_trans) < PARALLEL_KPI_MIN_ROWS:
+        groups = [fn(*args) for fn, args in tasks]
+    else:
+        with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+            futures = [executor.submit(fn, *args) for fn, args in tasks]
+            groups = [future.result() for future in futures]
+    
+    kpis = {}
+    for group in groups:
+        kpis.update(group)
+    return kpis
+
+
+def _work_order_kpis(df_wo: pd.DataFrame) -> dict:
+    """Maintenance KPIs; MTTR and MTBF share one breakdown groupby."""
+    reliability = calculate_reliability_stats(df_wo)
     return {
-        'mttr': calculate_mttr(df_wo),
-        'mtbf': calculate_mtbf(df_wo),
+        'mttr': reliability[['MTTR_Hours', 'Breakdown_Count', 'Total_Downtime']],
+        'mtbf': reliability[['MTBF_Hours', 'Breakdown_Count']].rename(columns={'Breakdown_Count': 'Failure_Count'}),
         'availability': calculate_equipment_availability(df_wo),
-        'maintenance_mix': calculate_maintenance_mix(df_wo),
-        'inventory_turnover': calculate_inventory_turnover(df_trans, df_products),
-        'stock_coverage': calculate_stock_coverage_days(df_trans, df_products),
-        'reorder_alerts': get_reorder_alerts(df_products),
+        'maintenance_mix': calculate_maintenance_mix(df_wo)
+    }
+
+
+def _inventory_kpis(df_trans: pd.DataFrame, df_products: pd.DataFrame) -> dict:
+    """Inventory KPIs; turnover and coverage share one issues groupby."""
+    issue_stats = calculate_issue_stats(df_trans)
+    return {
+        'inventory_turnover': calculate_inventory_turnover(df_trans, df_products, issue_stats),
+        'stock_coverage': calculate_stock_coverage_days(df_trans, df_products, issue_stats),
+        'reorder_alerts': get_reorder_alerts(df_products)
+    }
+
+
+def _cost_kpis(df_costs: pd.DataFrame, df_budget: pd.DataFrame) -> dict:
+    """Vendor payment and budget KPIs."""
+    return {
         'payment_variance': calculate_payment_variance(df_costs),
         'budget_adherence': calculate_budget_adherence(df_budget)
     }
 
 
+def build_work_order_rollup(df_wo: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pre-aggregate work orders per day, equipment, maintenance type and failure code.
+    Every executive summary input is a sum or a count, so date range and equipment filters
+    can be answered from this frame instead of the full work order history.
+    
+    Args:
+        df_wo: Work orders with Date, EquipmentID, MaintenanceType, FailureCode,
+               DowntimeHours and TotalCost columns
+    
+    Returns:
+        DataFrame with one row per key and WorkOrderCount, DowntimeHours and TotalCost sums
+    """
+    # dropna=False keeps preventive rows, which have no failure code
+    return df_wo.groupby(['Date', 'EquipmentID', 'MaintenanceType', 'FailureCode'],
+                         observed=True, sort=False, dropna=False).agg(
+        WorkOrderCount=('TotalCost', 'size'),
+        DowntimeHours=('DowntimeHours', 'sum'),
+        TotalCost=('TotalCost', 'sum')
+    ).reset_index()
+
+
 def get_executive_summary(df_wo: pd.DataFrame, df_trans: pd.DataFrame,
                           df_products: pd.DataFrame, equipment_ids: list = None) -> dict:
     """
     Get high-level executive summary KPIs.
     
     Args:
-        df_wo: Filtered work orders
+        df_wo: Filtered work orders, or the matching slice of build_work_order_rollup
         df_trans: Filtered transactions
         df_products: Products dimension
         equipment_ids: List of unique equipment IDs that should be considered for the timeframe
@@ -385,12 +548,12 @@ def get_executive_summary(df_wo: pd.DataFrame, df_trans: pd.DataFrame,
     """
     # Calculate timeframe days
     if not df_wo.empty:
-        date_min = df_wo['Date'].min()
-        date_max = df_wo['Date'].max()
-        if isinstance(date_min, str):
-            date_min = pd.to_datetime(date_min)
-            date_max = pd.to_datetime(date_max)
-        days = (date_max - date_min).days + 1
+        dates = df_wo['Date']
+        if dates.dtype == object:
+            dates = pd.to_datetime(dates)
+        # Span straight off the datetime64 buffer instead of boxing Timestamps
+        dates = dates.to_numpy()
+        days = int((dates.max() - dates.min()) // np.timedelta64(1, 'D')) + 1
     else:
         days = 365 # Default fallback
         
@@ -403,12 +566,10 @@ def get_executive_summary(df_wo: pd.DataFrame, df_trans: pd.DataFrame,
     availability = calculate_equipment_availability(df_wo, eq_count, days)
     maintenance_mix = calculate_maintenance_mix(df_wo)
     
-    # Overall MTTR and MTBF
-    breakdown_wo = df_wo[df_wo['MaintenanceType'] == 'Breakdown']
-    overall_mttr = breakdown_wo['DowntimeHours'].mean() if not breakdown_wo.empty else 0
-    
-    failure_count = len(breakdown_wo)
-    total_unplanned_downtime = breakdown_wo['DowntimeHours'].sum()
+    # Overall MTTR and MTBF, from the per-type totals the maintenance mix already aggregated
+    failure_count = maintenance_mix['Breakdown_Count']
+    total_unplanned_downtime = maintenance_mix['Breakdown_Downtime']
+    overall_mttr = total_unplanned_downtime / failure_count if failure_count > 0 else 0
     
     # MTBF = (Total Equipment * Period Hours - Unplanned Downtime) / Failures
     total_period_hours = eq_count * days * 24
@@ -417,7 +578,7 @@ def get_executive_summary(df_wo: pd.DataFrame, df_trans: pd.DataFrame,
     # Stock health
     critical_stock = 0
     if df_products is not None:
-        critical_stock = len(df_products[df_products['CurrentStock'] <= df_products['ReorderPoint']])
+        critical_stock = int((df_products['CurrentStock'].to_numpy() <= df_products['ReorderPoint'].to_numpy()).sum())
     
     return {
         'Total_Maintenance_Cost': df_wo['TotalCost'].sum(),
@@ -429,7 +590,7 @@ def get_executive_summary(df_wo: pd.DataFrame, df_trans: pd.DataFrame,
         'Planned_Downtime': maintenance_mix['Preventive_Downtime'],
         'MTTR_Hours': round(overall_mttr, 2),
         'MTBF_Hours': round(overall_mtbf, 2),
-        'Total_Work_Orders': len(df_wo),
+        'Total_Work_Orders': int(df_wo['WorkOrderCount'].sum()) if 'WorkOrderCount' in df_wo else len(df_wo),
         'Breakdown_Count': maintenance_mix['Breakdown_Count'],
         'Preventive_Pct': maintenance_mix['Preventive_Pct'],
         'Critical_Stock_Items': critical_stock,
@@ -486,13 +647,57 @@ def calculate_oee(df_prod: pd.DataFrame) -> dict:
         'Quality_Component': round(quality * 100, 2)
     }
 
+def calculate_oee_trend(df_prod: pd.DataFrame, freq: str = 'ME') -> pd.Series:
+    """
+    Calculate OEE per period with the same formula as calculate_oee.
+    The raw sums are aggregated once per period and the ratios computed on the small result,
+    instead of calling calculate_oee for every period.
+    
+    Args:
+        df_prod: Production data with Date and the calculate_oee columns
+        freq: Resample frequency (default: month end)
+    
+    Returns:
+        Series of OEE_Pct indexed by period; periods without production data are 0
+    """
+    if df_prod.empty:
+        return pd.Series(dtype=float)
+    
+    periods = df_prod.resample(freq, on='Date').agg(
+        Days=('OperatingHours', 'size'),
+        Operating_Hours=('OperatingHours', 'sum'),
+        Total_Parts=('TotalPartsProduced', 'sum'),
+        Good_Parts=('GoodPartsProduced', 'sum'),
+        Avg_Cycle_Time=('IdealCycleTime_s', 'mean')
+    )
+    
+    scheduled_hours = periods['Days'].to_numpy() * 24
+    operating_hours = periods['Operating_Hours'].to_numpy(dtype=float)
+    total_parts = periods['Total_Parts'].to_numpy(dtype=float)
+    cycle_time = periods['Avg_Cycle_Time'].to_numpy()
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        availability = np.where(scheduled_hours > 0, operating_hours / scheduled_hours, 0)
+        potential_parts = np.where(cycle_time > 0, (operating_hours * 3600) / cycle_time, 0)
+        performance = np.minimum(np.where(potential_parts > 0, total_parts / potential_parts, 0), 1.0)
+        quality = np.where(total_parts > 0, periods['Good_Parts'].to_numpy() / total_parts, 0)
+    
+    oee = np.round(availability * performance * quality * 100, 2)
+    return pd.Series(oee, index=periods.index)
+
+
 def calculate_planned_maintenance_percentage(df_wo: pd.DataFrame) -> float:
     """
     Calculate the percentage of maintenance work that is planned.
+    Accepts raw work orders or a build_work_order_rollup frame.
     """
 
-    planned = df_wo[df_wo['MaintenanceType'] == 'Preventive']['WorkOrderID'].count()
-    total = df_wo['WorkOrderID'].count()
+    if 'WorkOrderCount' in df_wo:
+        planned = df_wo.loc[df_wo['MaintenanceType'] == 'Preventive', 'WorkOrderCount'].sum()
+        total = df_wo['WorkOrderCount'].sum()
+    else:
+        planned = df_wo[df_wo['MaintenanceType'] == 'Preventive']['WorkOrderID'].count()
+        total = df_wo['WorkOrderID'].count()
 
     if total == 0:
         return 100.0
@@ -3,6 +3,7 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 import os
 import sys
 
@@ -10,10 +11,10 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from kpi_calculations import (
-    get_executive_summary, calculate_oee,
-    calculate_planned_maintenance_percentage
+    get_executive_summary, calculate_oee, calculate_oee_trend,
+    calculate_planned_maintenance_percentage, build_work_order_rollup, data_version, read_fact_table
 )
-from advanced_analytics import get_failure_root_cause, predict_failure_probability, forecast_maintenance_costs
+from advanced_analytics import get_failure_root_cause, predict_failure_probability, forecast_maintenance_costs, load_sensor_readings, SENSOR_COLUMNS
 from styles import (
     inject_custom_css, kpi_card, get_kpi_hints,
     section_header, style_plotly_chart
@@ -39,56 +40,90 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 
 @st.cache_data
-def load_data():
-    df_wo = pd.read_csv(os.path.join(DATA_DIR, "Fact_Maintenance_WorkOrders_Enriched.csv"))
-    df_wo['Date'] = pd.to_datetime(df_wo['Date'])
+def load_data(data_mtime):
+    df_wo = read_fact_table(DATA_DIR, "Fact_Maintenance_WorkOrders_Enriched",
+                            columns=['Date', 'EquipmentID', 'MaintenanceType', 'FailureCode',
+                                     'DowntimeHours', 'TotalCost'],
+                            dtype={'EquipmentID': 'category', 'MaintenanceType': 'category', 'FailureCode': 'category'},
+                            date_columns=['Date'])
     df_equip = pd.read_csv(os.path.join(DATA_DIR, "Dim_Equipment.csv"))
-    df_prod = pd.read_csv(os.path.join(DATA_DIR, "Dim_Product_Enriched.csv"))
-    df_budget = pd.read_csv(os.path.join(DATA_DIR, "Fact_Budget_vs_Actual.csv"))
-    df_budget['Date'] = pd.to_datetime(df_budget['Date'])
-    df_oee_data = pd.read_csv(os.path.join(DATA_DIR, "Fact_Production_Data_Enriched.csv"))
-    df_oee_data['Date'] = pd.to_datetime(df_oee_data['Date'])
+    df_prod = read_fact_table(DATA_DIR, "Dim_Product_Enriched",
+                              dtype={'CurrentStock': 'int32', 'ReorderPoint': 'int32', 'Stock Status': 'category'})
+    df_budget = read_fact_table(DATA_DIR, "Fact_Budget_vs_Actual", date_columns=['Date'])
+    df_oee_data = read_fact_table(DATA_DIR, "Fact_Production_Data_Enriched", date_columns=['Date'])
     try:
-        df_sensor = pd.read_csv(os.path.join(DATA_DIR, "Fact_Sensor_Readings.csv"))
+        df_sensor = load_sensor_readings(DATA_DIR, columns=SENSOR_COLUMNS)
     except FileNotFoundError:
         df_sensor = pd.DataFrame() # Return empty dataframe if not found
-    return df_wo, df_equip, df_prod, df_budget, df_sensor, df_oee_data
-
+    # The period KPIs only need per-day sums and counts, so keep the rollup rather than every work order
+    wo_rollup = build_work_order_rollup(df_wo)
+    # Date-sorted frames let the period filter slice by binary search instead of masking every row
+    wo_rollup = wo_rollup.sort_values('Date', kind='stable', ignore_index=True)
+    df_oee_data = df_oee_data.sort_values('Date', kind='stable', ignore_index=True)
+    return wo_rollup, df_equip, df_prod, df_budget, df_sensor, df_oee_data
+
+data_mtime = data_version(DATA_DIR)
 try:
-    df_wo, df_equip, df_prod, df_budget, df_sensor, df_oee_data = load_data()
+    wo_rollup, df_equip, df_prod, df_budget, df_sensor, df_oee_data = load_data(data_mtime)
 except FileNotFoundError as e:
     st.error(f"Data not found: {e}. Please run `python generate_data.py` and `python preprocess_data.py` first.")
     st.stop()
 
 # --- Sidebar Filters ---
 st.sidebar.header("🔍 Filters")
-min_date, max_date = df_wo['Date'].min().date(), df_wo['Date'].max().date()
+min_date, max_date = wo_rollup['Date'].min().date(), wo_rollup['Date'].max().date()
 date_range = st.sidebar.date_input("Date Range", (min_date, max_date), min_date, max_date)
 
 equipment_options = ['All'] + list(df_equip['EquipmentName'].unique())
 selected_equipment = st.sidebar.selectbox("Equipment", equipment_options)
 
-# --- Filter Data ---
-if len(date_range) == 2:
-    start_date, end_date = date_range
-    df_wo_filtered = df_wo[(df_wo['Date'].dt.date >= start_date) & (df_wo['Date'].dt.date <= end_date)]
-    df_oee_filtered = df_oee_data[(df_oee_data['Date'].dt.date >= start_date) & (df_oee_data['Date'].dt.date <= end_date)]
-else:
-    df_wo_filtered = df_wo.copy()
-    df_oee_filtered = df_oee_data.copy()
+# --- Filter Data & KPI Calculations ---
+# Cached per filter selection, so reruns from other widgets skip the masking and every KPI pass.
+# The underscore frames are not hashed; data_mtime stands in for them in the cache key.
+@st.cache_data(show_spinner=False, max_entries=64)
+def calculate_period_kpis(_wo_rollup, _df_oee, _df_prod, _df_equip, data_mtime, start_date, end_date, equip_id):
+    df_wo_filtered, df_oee_filtered = _wo_rollup, _df_oee
+    if start_date is not None:
+        # Both frames are sorted by Date at load; the end date is inclusive of the whole day
+        bounds = [pd.Timestamp(start_date), pd.Timestamp(end_date) + pd.Timedelta(days=1)]
+        lo, hi = df_wo_filtered['Date'].searchsorted(bounds)
+        df_wo_filtered = df_wo_filtered.iloc[lo:hi]
+        lo, hi = df_oee_filtered['Date'].searchsorted(bounds)
+        df_oee_filtered = df_oee_filtered.iloc[lo:hi]
+    if equip_id is not None:
+        df_wo_filtered = df_wo_filtered[df_wo_filtered['EquipmentID'] == equip_id]
+        df_oee_filtered = df_oee_filtered[df_oee_filtered['EquipmentID'] == equip_id]
+    
+    summary = get_executive_summary(df_wo_filtered, None, _df_prod, equipment_ids=_df_equip['EquipmentID'].tolist())
+    oee_trend = calculate_oee_trend(df_oee_filtered)
+    return (summary, calculate_oee(df_oee_filtered), calculate_planned_maintenance_percentage(df_wo_filtered),
+            get_failure_root_cause(df_wo_filtered), oee_trend)
+
+# The budget chart ignores the sidebar filters, so its totals and forecast only change with the data
+@st.cache_data(show_spinner=False)
+def budget_monthly_trend(_df_budget, data_mtime):
+    budget_monthly = _df_budget.groupby(_df_budget['Date'].dt.to_period('M')).agg({
+        'BudgetAmount': 'sum',
+        'ActualAmount': 'sum'
+    }).reset_index()
+    budget_monthly['Date'] = budget_monthly['Date'].astype(str)
+    return budget_monthly
 
+@st.cache_data(show_spinner=False)
+def budget_forecast(_df_budget, data_mtime):
+    forecast = forecast_maintenance_costs(_df_budget)
+    forecast['Date'] = forecast['Date'].astype(str)
+    return forecast
+
+start_date, end_date = date_range if len(date_range) == 2 else (None, None)
+equip_id = None
 if selected_equipment != 'All':
     equip_id = df_equip[df_equip['EquipmentName'] == selected_equipment]['EquipmentID'].values[0]
-    df_wo_filtered = df_wo_filtered[df_wo_filtered['EquipmentID'] == equip_id]
-    df_oee_filtered = df_oee_filtered[df_oee_filtered['EquipmentID'] == equip_id]
 
-# --- KPI Calculations ---
 kpi_hints = get_kpi_hints()
-summary = get_executive_summary(df_wo_filtered, None, df_prod, equipment_ids=list(df_equip['EquipmentID'].unique()))
-
-oee_metrics = calculate_oee(df_oee_filtered)
-planned_maintenance_pct = calculate_planned_maintenance_percentage(df_wo_filtered)
-failure_causes = get_failure_root_cause(df_wo_filtered)
+summary, oee_metrics, planned_maintenance_pct, failure_causes, oee_trend = calculate_period_kpis(
+    wo_rollup, df_oee_data, df_prod, df_equip, data_mtime, start_date, end_date, equip_id
+)
 
 # --- Dashboard Layout ---
 st.markdown("---")
@@ -96,7 +131,6 @@ section_header("Overall Performance", "🚀")
 
 col1, col2 = st.columns(2)
 with col1:
-    oee_trend = df_oee_filtered.resample('M', on='Date').apply(lambda x: calculate_oee(x)['OEE_Pct']).fillna(0)
     sparkline = go.Figure(go.Scatter(
         x=oee_trend.index, y=oee_trend.values,
         mode='lines', fill='tozeroy', line_color='#00bfff',
@@ -131,39 +165,27 @@ with cols[2]:
 
 st.markdown("---")
 section_header("Maintenance Strategy", "🧭")
-cols = st.columns(3)
+cols = st.columns([1, 2])
 with cols[0]:
     kpi_card("Planned Maintenance", f"{planned_maintenance_pct:.2f}%", kpi_hints['Planned_Maintenance_Pct'],
              f"Preventive vs. Reactive work ratio.")
 with cols[1]:
-    st.markdown("### Maintenance Cost Distribution")
-    cost_data = pd.DataFrame({
-        'Type': ['Preventive', 'Breakdown'],
-        'Cost': [summary['Preventive_Cost'], summary['Breakdown_Cost']],
-    })
-    fig = px.pie(cost_data, values='Cost', names='Type', hole=0.5,
-                 color_discrete_map={'Preventive': '#2ecc71', 'Breakdown': '#e74c3c'})
-    st.plotly_chart(fig, use_container_width=True)
-with cols[2]:
-    st.markdown("### Downtime Analysis")
-    downtime_data = pd.DataFrame({
-        'Type': ['Planned', 'Unplanned'],
-        'Hours': [summary['Planned_Downtime'], summary['Unplanned_Downtime']],
-    })
-    fig = px.pie(downtime_data, values='Hours', names='Type', hole=0.5,
-                 color_discrete_map={'Planned': '#3498db', 'Unplanned': '#f39c12'})
+    # Both donuts share one figure, so the browser sets up a single Plotly chart instead of two
+    fig = make_subplots(rows=1, cols=2, specs=[[{'type': 'domain'}, {'type': 'domain'}]],
+                        subplot_titles=('Maintenance Cost Distribution', 'Downtime Analysis'))
+    fig.add_trace(go.Pie(labels=['Preventive', 'Breakdown'],
+                         values=[summary['Preventive_Cost'], summary['Breakdown_Cost']],
+                         hole=0.5, marker_colors=['#2ecc71', '#e74c3c'], name='Cost'), 1, 1)
+    fig.add_trace(go.Pie(labels=['Planned', 'Unplanned'],
+                         values=[summary['Planned_Downtime'], summary['Unplanned_Downtime']],
+                         hole=0.5, marker_colors=['#3498db', '#f39c12'], name='Hours'), 1, 2)
     st.plotly_chart(fig, use_container_width=True)
 
 with st.expander("Expand for More Details"):
     st.markdown("---")
     section_header("Budget vs Actual Trend", "📈")
-    budget_monthly = df_budget.groupby(df_budget['Date'].dt.to_period('M')).agg({
-        'BudgetAmount': 'sum',
-        'ActualAmount': 'sum'
-    }).reset_index()
-    budget_monthly['Date'] = budget_monthly['Date'].astype(str)
-    forecast = forecast_maintenance_costs(df_budget)
-    forecast['Date'] = forecast['Date'].astype(str)
+    budget_monthly = budget_monthly_trend(df_budget, data_mtime)
+    forecast = budget_forecast(df_budget, data_mtime)
     fig = go.Figure()
     fig.add_trace(go.Bar(name='Budget', x=budget_monthly['Date'], y=budget_monthly['BudgetAmount'], marker_color=px.colors.qualitative.Plotly[0]))
     fig.add_trace(go.Scatter(name='Actual', x=budget_monthly['Date'], y=budget_monthly['ActualAmount'], mode='lines+markers', line=dict(color=px.colors.qualitative.Plotly[1])))
@@ -10,8 +10,8 @@ import sys
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from kpi_calculations import calculate_mttr, calculate_mtbf, calculate_schedule_compliance
-from advanced_analytics import predict_failure_probability
+from kpi_calculations import calculate_reliability_stats, calculate_schedule_compliance, data_version, read_fact_table
+from advanced_analytics import predict_failure_probability, load_sensor_readings, SENSOR_COLUMNS
 from styles import (
     inject_custom_css, COLORS, format_currency, style_plotly_chart,
     section_header
@@ -37,9 +37,10 @@ DATA_DIR = os.path.join(BASE_DIR, "data")
 
 
 @st.cache_data
-def load_data():
-    df_wo = pd.read_csv(os.path.join(DATA_DIR, "Fact_Maintenance_WorkOrders_Enriched.csv"))
-    df_wo['Date'] = pd.to_datetime(df_wo['Date'])
+def load_data(data_mtime):
+    df_wo = read_fact_table(DATA_DIR, "Fact_Maintenance_WorkOrders_Enriched",
+                            dtype={'MaintenanceType': 'category'},
+                            date_columns=['Date', 'ScheduledDate'])
     df_equip = pd.read_csv(os.path.join(DATA_DIR, "Dim_Equipment.csv"))
     df_tech = pd.read_csv(os.path.join(DATA_DIR, "Dim_Technician.csv"))
     
@@ -48,14 +49,14 @@ def load_data():
     df = pd.merge(df, df_tech, on="TechnicianID")
     
     try:
-        df_sensor = pd.read_csv(os.path.join(DATA_DIR, "Fact_Sensor_Readings.csv"))
+        df_sensor = load_sensor_readings(DATA_DIR, columns=SENSOR_COLUMNS)
     except:
         df_sensor = pd.DataFrame()
         
     return df, df_equip, df_sensor
 
 
-df, df_equip, df_sensor = load_data()
+df, df_equip, df_sensor = load_data(data_version(DATA_DIR))
 
 # =============================================================================
 # SIDEBAR FILTERS
@@ -88,7 +89,8 @@ date_range = st.sidebar.date_input(
 )
 if len(date_range) == 2:
     start_date, end_date = date_range
-    df = df[(df['Date'].dt.date >= start_date) & (df['Date'].dt.date <= end_date)]
+    # Timestamp bounds compare on the datetime64 buffer; the end date is inclusive of the whole day
+    df = df[(df['Date'] >= pd.Timestamp(start_date)) & (df['Date'] < pd.Timestamp(end_date) + pd.Timedelta(days=1))]
     num_days = (end_date - start_date).days + 1
 else:
     num_days = (df['Date'].max() - df['Date'].min()).days + 1
@@ -250,18 +252,14 @@ with col_left:
 with col_right:
     section_header("MTTR vs MTBF Quadrant", "🎯")
     
-    # Calculate MTTR and MTBF per equipment
-    mttr_data = calculate_mttr(df)
+    # Calculate MTTR and MTBF per equipment in one pass, using dynamic days for MTBF
+    reliability_data = calculate_reliability_stats(df, days=num_days, breakdown_wo=breakdown_df)
     
-    # Use dynamic days for MTBF
-    mtbf_data = calculate_mtbf(df, days=num_days)
-    
-    if not mttr_data.empty and not mtbf_data.empty:
-        # Merge data
-        quadrant_data = mttr_data.merge(mtbf_data, on='EquipmentID', how='outer').fillna(0)
-        quadrant_data = quadrant_data.merge(
-            df_equip[['EquipmentID', 'EquipmentName']], 
-            on='EquipmentID'
+    if not reliability_data.empty:
+        # Indexed by EquipmentID, so the equipment names line up with a plain index join
+        quadrant_data = reliability_data.join(
+            df_equip.set_index('EquipmentID')['EquipmentName'],
+            how='inner'
         )
         
         # Define thresholds
@@ -307,7 +305,7 @@ col_left2, col_right2 = st.columns(2)
 with col_left2:
     section_header("Cost by Maintenance Type", "💵")
     
-    cost_by_type = df.groupby('MaintenanceType').agg({
+    cost_by_type = df.groupby('MaintenanceType', observed=True).agg({
         'TotalCost': 'sum',
         'WorkOrderID': 'count'
     }).reset_index()
@@ -11,7 +11,8 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from kpi_calculations import (
-    calculate_inventory_turnover, calculate_stock_coverage_days, get_reorder_alerts
+    calculate_issue_stats, calculate_inventory_turnover, calculate_stock_coverage_days, get_reorder_alerts,
+    data_version, read_fact_table
 )
 from styles import (
     inject_custom_css, COLORS, format_currency, style_plotly_chart,
@@ -38,14 +39,19 @@ DATA_DIR = os.path.join(BASE_DIR, "data")
 
 
 @st.cache_data
-def load_data():
-    df_prod = pd.read_csv(os.path.join(DATA_DIR, "Dim_Product_Enriched.csv"))
-    df_trans = pd.read_csv(os.path.join(DATA_DIR, "Fact_Inventory_Transactions.csv"))
-    df_trans['Date'] = pd.to_datetime(df_trans['Date'])
+def load_data(data_mtime):
+    df_prod = read_fact_table(DATA_DIR, "Dim_Product_Enriched",
+                              dtype={'CurrentStock': 'int32', 'ReorderPoint': 'int32', 'MOQ': 'int32'})
+    df_trans = read_fact_table(DATA_DIR, "Fact_Inventory_Transactions",
+                               columns=['Date', 'ProductID', 'Quantity', 'Type', 'UnitCost'],
+                               dtype={'ProductID': 'category', 'Type': 'category',
+                                      'Quantity': 'int32'},
+                               date_columns=['Date'])
+    df_trans['ValueChange'] = df_trans['Quantity'] * df_trans['UnitCost']
     return df_prod, df_trans
 
 
-df_prod, df_trans = load_data()
+df_prod, df_trans = load_data(data_version(DATA_DIR))
 
 # =============================================================================
 # SIDEBAR FILTERS
@@ -76,8 +82,9 @@ if selected_abc != "All":
 # KPI CALCULATIONS
 # =============================================================================
 
-turnover_df = calculate_inventory_turnover(df_trans_filtered, df_prod_filtered)
-coverage_df = calculate_stock_coverage_days(df_trans_filtered, df_prod_filtered)
+issue_stats = calculate_issue_stats(df_trans_filtered)
+turnover_df = calculate_inventory_turnover(df_trans_filtered, df_prod_filtered, issue_stats)
+coverage_df = calculate_stock_coverage_days(df_trans_filtered, df_prod_filtered, issue_stats)
 reorder_alerts = get_reorder_alerts(df_prod_filtered)
 
 # =============================================================================
@@ -92,7 +99,7 @@ col1, col2, col3, col4, col5 = st.columns(5)
 total_products = len(df_prod_filtered)
 total_stock_value = (df_prod_filtered['CurrentStock'] * df_prod_filtered['UnitCost']).sum()
 avg_turnover = turnover_df['Turnover_Ratio'].mean()
-critical_items = len(df_prod_filtered[df_prod_filtered['Stock Status'] == 'Critical'])
+critical_items = int((df_prod_filtered['Stock Status'] == 'Critical').sum())
 healthy_items = len(df_prod_filtered[df_prod_filtered['Stock Status'] == 'Healthy'])
 
 with col1:
@@ -215,9 +222,6 @@ with col_right2:
     section_header("Inventory Value Trend", "📈")
     
     # Calculate cumulative inventory value over time
-    df_trans_filtered = df_trans_filtered.copy()
-    df_trans_filtered['ValueChange'] = df_trans_filtered['Quantity'] * df_trans_filtered['UnitCost']
-    
     daily_value = df_trans_filtered.groupby('Date')['ValueChange'].sum().cumsum().reset_index()
     
     # Add initial inventory value
@@ -261,7 +265,7 @@ if not reorder_alerts.empty:
     ]].copy()
     
     display_df['Shortage'] = display_df['ReorderPoint'] - display_df['CurrentStock']
-    display_df['Reorder Qty'] = display_df[['Shortage', 'MOQ']].max(axis=1)
+    display_df['Reorder Qty'] = np.maximum(display_df['Shortage'].to_numpy(), display_df['MOQ'].to_numpy())
     display_df['Estimated Cost'] = display_df['Reorder Qty'] * display_df['UnitCost']
     
     # Format currency columns
@@ -10,6 +10,8 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from styles import inject_custom_css
+from advanced_analytics import load_sensor_readings, SENSOR_COLUMNS
+from kpi_calculations import data_version
 
 st.set_page_config(page_title="Predictive Insights", page_icon="🔮", layout="wide")
 inject_custom_css()
@@ -21,15 +23,13 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 
 @st.cache_data
-def load_sensor_data():
+def load_sensor_data(data_mtime):
     try:
-        df = pd.read_csv(os.path.join(DATA_DIR, "Fact_Sensor_Readings.csv"))
-        df['Timestamp'] = pd.to_datetime(df['Timestamp'])
-        return df
+        return load_sensor_readings(DATA_DIR, columns=SENSOR_COLUMNS)
     except:
         return None
 
-df_sensor = load_sensor_data()
+df_sensor = load_sensor_data(data_version(DATA_DIR))
 
 if df_sensor is None:
     st.error("Sensor data not found.")
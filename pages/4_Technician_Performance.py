@@ -9,6 +9,7 @@ import sys
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from kpi_calculations import data_version, read_fact_table
 from styles import (
     inject_custom_css, COLORS, format_currency, style_plotly_chart,
     section_header
@@ -34,15 +35,14 @@ DATA_DIR = os.path.join(BASE_DIR, "data")
 
 
 @st.cache_data
-def load_data():
-    df_wo = pd.read_csv(os.path.join(DATA_DIR, "Fact_Maintenance_WorkOrders_Enriched.csv"))
-    df_wo['Date'] = pd.to_datetime(df_wo['Date'])
+def load_data(data_mtime):
+    df_wo = read_fact_table(DATA_DIR, "Fact_Maintenance_WorkOrders_Enriched", date_columns=['Date'])
     df_tech = pd.read_csv(os.path.join(DATA_DIR, "Dim_Technician.csv"))
     df = pd.merge(df_wo, df_tech, on="TechnicianID")
     return df, df_tech
 
 
-df, df_tech = load_data()
+df, df_tech = load_data(data_version(DATA_DIR))
 
 # =============================================================================
 # SIDEBAR FILTERS
@@ -212,13 +212,15 @@ with col_left2:
 with col_right2:
     section_header("Monthly Productivity Trend", "📈")
     
-    df_filtered['Month'] = df_filtered['Date'].dt.to_period('M').astype(str)
+    # Group on a derived key rather than adding a Month column to the cached frame
+    month = df_filtered['Date'].dt.to_period('M').rename('Month')
     
-    monthly_stats = df_filtered.groupby('Month').agg({
+    monthly_stats = df_filtered.groupby(month).agg({
         'WorkOrderID': 'count',
         'LaborHours': 'sum'
     }).reset_index()
     monthly_stats.columns = ['Month', 'Work_Orders', 'Labor_Hours']
+    monthly_stats['Month'] = monthly_stats['Month'].astype(str)
     
     fig = go.Figure()
     
@@ -9,7 +9,7 @@ import sys
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from kpi_calculations import calculate_payment_variance, calculate_budget_adherence
+from kpi_calculations import calculate_payment_variance, calculate_budget_adherence, data_version
 from advanced_analytics import calculate_vendor_score
 from styles import (
     inject_custom_css, COLORS, format_currency, style_plotly_chart,
@@ -36,15 +36,17 @@ DATA_DIR = os.path.join(BASE_DIR, "data")
 
 
 @st.cache_data
-def load_data():
-    df_costs = pd.read_csv(os.path.join(DATA_DIR, "Fact_Costs.csv"))
-    df_budget = pd.read_csv(os.path.join(DATA_DIR, "Fact_Budget_vs_Actual.csv"))
+def load_data(data_mtime):
+    df_costs = pd.read_csv(os.path.join(DATA_DIR, "Fact_Costs.csv"),
+                           dtype={'VendorID': 'category'})
+    df_budget = pd.read_csv(os.path.join(DATA_DIR, "Fact_Budget_vs_Actual.csv"),
+                            dtype={'CostCenter': 'category', 'GLAccount': 'category'})
     df_budget['Date'] = pd.to_datetime(df_budget['Date'])
     df_vendor = pd.read_csv(os.path.join(DATA_DIR, "Dim_Vendor.csv"))
     return df_costs, df_budget, df_vendor
 
 
-df_costs, df_budget, df_vendor = load_data()
+df_costs, df_budget, df_vendor = load_data(data_version(DATA_DIR))
 
 # =============================================================================
 # KPI CALCULATIONS
@@ -71,6 +73,11 @@ selected_cc = st.sidebar.selectbox("Cost Center", cost_centers)
 
 if selected_cc != "All":
     df_budget_filtered = df_budget[df_budget['CostCenter'] == selected_cc]
+    # Drop the other cost centers' categories: plotly's treemap path aggregation fails on empty groups
+    df_budget_filtered = df_budget_filtered.assign(
+        CostCenter=df_budget_filtered['CostCenter'].cat.remove_unused_categories(),
+        GLAccount=df_budget_filtered['GLAccount'].cat.remove_unused_categories()
+    )
 else:
     df_budget_filtered = df_budget
 
@@ -223,7 +230,7 @@ col_left2, col_right2 = st.columns(2)
 with col_left2:
     section_header("Budget vs Actual by Cost Center", "🏢")
     
-    cc_summary = df_budget_filtered.groupby('CostCenter').agg({
+    cc_summary = df_budget_filtered.groupby('CostCenter', observed=True).agg({
         'BudgetAmount': 'sum',
         'ActualAmount': 'sum'
     }).reset_index()
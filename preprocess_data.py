@@ -1,43 +1,46 @@
 
 import pandas as pd
+import numpy as np
 import os
 from datetime import datetime, timedelta
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 
+def write_table(df, name):
+    """Writes the CSV plus the zstd Parquet copy that the dashboard pages read first."""
+    df.to_csv(os.path.join(DATA_DIR, f"{name}.csv"), index=False)
+    df.to_parquet(os.path.join(DATA_DIR, f"{name}.parquet"), compression="zstd", index=False)
+
 def create_dim_date(start_date, end_date):
     """Creates a Date Dimension table."""
     date_range = pd.date_range(start=start_date, end=end_date)
-    dim_date = pd.DataFrame({'Date': date_range})
     
-    dim_date['Date'] = dim_date['Date'].dt.date
-    dim_date['Year'] = pd.to_datetime(dim_date['Date']).dt.year
-    dim_date['MonthName'] = pd.to_datetime(dim_date['Date']).dt.strftime('%B')
-    dim_date['MonthNumber'] = pd.to_datetime(dim_date['Date']).dt.month
-    dim_date['Quarter'] = pd.to_datetime(dim_date['Date']).dt.quarter
-    dim_date['WeekNumber'] = pd.to_datetime(dim_date['Date']).dt.isocalendar().week
-    dim_date['DayOfWeek'] = pd.to_datetime(dim_date['Date']).dt.day_name()
-    dim_date['IsWorkingDay'] = pd.to_datetime(dim_date['Date']).dt.dayofweek < 5 # Mon=0, Sun=6
+    # Calendar attributes come straight off the DatetimeIndex; no per-column re-parse of Date
+    dim_date = pd.DataFrame({
+        'Date': date_range.date,
+        'Year': date_range.year,
+        'MonthName': date_range.strftime('%B'),
+        'MonthNumber': date_range.month,
+        'Quarter': date_range.quarter,
+        'WeekNumber': date_range.isocalendar()['week'].array,
+        'DayOfWeek': date_range.day_name(),
+        'IsWorkingDay': date_range.dayofweek < 5 # Mon=0, Sun=6
+    })
     
     return dim_date
 
 def process_work_orders():
     """Enriches Fact_Maintenance_WorkOrders."""
-    df = pd.read_csv(os.path.join(DATA_DIR, "Fact_Maintenance_WorkOrders.csv"))
+    df = pd.read_csv(os.path.join(DATA_DIR, "Fact_Maintenance_WorkOrders.csv"),
+                     parse_dates=['Date', 'ScheduledDate'])
     
     # 1. Maintenance Category
-    df['Maintenance Category'] = df['MaintenanceType'].apply(
-        lambda x: "Planned" if x == "Preventive" else "Unplanned"
-    )
+    df['Maintenance Category'] = np.where(df['MaintenanceType'] == "Preventive", "Planned", "Unplanned")
     
     # 2. Cost Segment
-    def get_cost_segment(cost):
-        if cost > 10000: return "High"
-        if cost > 2000: return "Medium"
-        return "Low"
-        
-    df['Cost Segment'] = df['TotalCost'].apply(get_cost_segment)
+    cost = df['TotalCost'].to_numpy()
+    df['Cost Segment'] = np.select([cost > 10000, cost > 2000], ["High", "Medium"], default="Low")
     
     return df
 
@@ -45,19 +48,19 @@ def process_products():
     """Enriches Dim_Product."""
     df = pd.read_csv(os.path.join(DATA_DIR, "Dim_Product.csv"))
     
-    # 3. Stock Status
-    def get_stock_status(row):
-        if row['CurrentStock'] <= row['ReorderPoint']: return "Critical"
-        if row['CurrentStock'] <= row['SafetyStock']: return "Stockout Risk"
-        return "Healthy"
-
-    df['Stock Status'] = df.apply(get_stock_status, axis=1)
+    # 3. Stock Status (first matching condition wins, as in the original if-chain)
+    stock = df['CurrentStock'].to_numpy()
+    df['Stock Status'] = np.select(
+        [stock <= df['ReorderPoint'].to_numpy(), stock <= df['SafetyStock'].to_numpy()],
+        ["Critical", "Stockout Risk"],
+        default="Healthy"
+    )
     
     return df
 
 def process_production_data():
     """Loads and checks the production data."""
-    df = pd.read_csv(os.path.join(DATA_DIR, "Fact_Production_Data.csv"))
+    df = pd.read_csv(os.path.join(DATA_DIR, "Fact_Production_Data.csv"), parse_dates=['Date'])
     # Basic check, can be expanded
     assert "Date" in df.columns
     assert "EquipmentID" in df.columns
@@ -76,18 +79,18 @@ def main():
     
     # 1. Process Work Orders
     df_wo = process_work_orders()
-    df_wo.to_csv(os.path.join(DATA_DIR, "Fact_Maintenance_WorkOrders_Enriched.csv"), index=False)
+    write_table(df_wo, "Fact_Maintenance_WorkOrders_Enriched")
     print(f"Generated Fact_Maintenance_WorkOrders_Enriched.csv ({len(df_wo)} rows)")
     
     # 2. Process Products
     df_prod = process_products()
-    df_prod.to_csv(os.path.join(DATA_DIR, "Dim_Product_Enriched.csv"), index=False)
+    write_table(df_prod, "Dim_Product_Enriched")
     print(f"Generated Dim_Product_Enriched.csv ({len(df_prod)} rows)")
 
     # 3. Process Production Data
     df_oee = process_production_data()
     # For now, we just copy it over, but enrichment could happen here
-    df_oee.to_csv(os.path.join(DATA_DIR, "Fact_Production_Data_Enriched.csv"), index=False)
+    write_table(df_oee, "Fact_Production_Data_Enriched")
     print(f"Generated Fact_Production_Data_Enriched.csv ({len(df_oee)} rows)")
     
     print("Preprocessing complete.")